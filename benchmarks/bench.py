@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+
+# Micro-benchmarks for the csv decode, transform, and conform/emit hot paths, w/ the fixtures in
+#   benchmarks/fixtures (see make_fixtures.py). Each benchmark runs on each fixture file:
+#   csv_decode: content bytes -> csv rows (sync.iter_content_lines + csv.DictReader)
+#   transform_jh_csse_daily, transform_italy_regions_daily: legacy per-record transforms
+#   transform_row: prepared (per-file) transformer, row-wise, for compact rows (csv values lists)
+#   transform_row_columns: prepared transformer, column-wise, for compact rows
+#   csv_records, csv_records_columnar: content bytes -> transformed records, as synced
+#       (sync.iter_csv_records: parse and transform, row-wise and column-wise)
+#   process_records: conform to the catalog schema and write RECORD messages (to a null output)
+# Results (JSON) per benchmark and fixture: rows/sec (best and median of --repeat runs of at least
+#   --min-time seconds) and peak memory allocated (tracemalloc) for one pass over the fixture.
+# Usage:
+#   > python benchmarks/bench.py --output bench.json
+#   > python benchmarks/bench.py --compare bench.json
+#   --compare: compares rows/sec w/ previous results; exit code 1 if a benchmark is slower by
+#   more than --threshold (default 10%)
+
+import os
+import sys
+import csv
+import json
+import time
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+
+BENCHMARKS_PATH = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_PATH))
+
+# pylint: disable=wrong-import-position
+from tap_covid_19.discover import discover
+from tap_covid_19.emitter import MessageWriter, set_writer
+from tap_covid_19.sync import iter_content_lines, iter_csv_records, process_records
+from tap_covid_19.transform import FileInfo, get_file_transformer, transform_jh_csse_daily, \
+    transform_italy_regions_daily
+
+FIXTURES_PATH = os.path.join(BENCHMARKS_PATH, 'fixtures')
+
+LEGACY_TRANSFORMS = {
+    'jh_csse_daily': ('transform_jh_csse_daily', transform_jh_csse_daily),
+    'italy_daily_region': ('transform_italy_regions_daily', transform_italy_regions_daily)
+}
+
+
+class NullOutput(object):
+    def write(self, data):
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+# Fixture files: [(stream_name, file_name, content bytes)]
+def get_fixtures():
+    fixtures = []
+    for stream_name in sorted(os.listdir(FIXTURES_PATH)):
+        stream_path = os.path.join(FIXTURES_PATH, stream_name)
+        for file_name in sorted(os.listdir(stream_path)):
+            with open(os.path.join(stream_path, file_name), 'rb') as file:
+                fixtures.append((stream_name, file_name, file.read()))
+    return fixtures
+
+
+def decode_rows(content):
+    return list(csv.DictReader(iter_content_lines(content)))
+
+
+# csv rows w/ the fields set by the tap (same as sync.iter_csv_records)
+def prepare_rows(file_name, content):
+    rows = decode_rows(content)
+    for row_number, row in enumerate(rows, start=1):
+        row['git_path'] = 'fixtures/{}'.format(file_name)
+        row['git_sha'] = '0' * 40
+        row['git_last_modified'] = '2020-03-27T00:00:00Z'
+        row['git_file_name'] = file_name
+        row['row_number'] = row_number
+    return rows
+
+
+# Header and compact rows (csv values lists, w/o blank lines; same as sync.iter_csv_records)
+def decode_compact_rows(content):
+    reader = csv.reader(iter_content_lines(content))
+    header = next(reader, None)
+    return header, [row for row in reader if row]
+
+
+# Benchmarks for a fixture: [(name, function)]; each function runs one pass over the fixture
+def get_benchmarks(catalog, stream_name, file_name, content):
+    rows = prepare_rows(file_name, content)
+    header, compact_rows = decode_compact_rows(content)
+    file_data = {
+        'name': file_name,
+        'path': 'fixtures/{}'.format(file_name),
+        'sha': '0' * 40,
+        'last_modified': '2020-03-27T00:00:00Z'
+    }
+    file_info = FileInfo(file_data['path'], file_data['sha'], file_data['last_modified'],
+                         file_data['name'])
+    records = list(iter_csv_records(stream_name, file_data, content))
+    time_extracted = datetime.now(timezone.utc)
+
+    def csv_decode():
+        decode_rows(content)
+
+    def transform_row():
+        transform = get_file_transformer(stream_name, file_name, header).transform_row
+        for row_number, row in enumerate(compact_rows, start=1):
+            transform(row, row_number, file_info)
+
+    def transform_row_columns():
+        get_file_transformer(stream_name, file_name, header).transform_row_columns(
+            compact_rows, file_info)
+
+    def csv_records():
+        list(iter_csv_records(stream_name, file_data, content))
+
+    def csv_records_columnar():
+        list(iter_csv_records(stream_name, file_data, content, columnar=True))
+
+    def process():
+        process_records(catalog, stream_name, records, time_extracted)
+
+    benchmarks = [('csv_decode', csv_decode)]
+    if stream_name in LEGACY_TRANSFORMS:
+        legacy_name, legacy_transform = LEGACY_TRANSFORMS[stream_name]
+
+        def legacy():
+            for row in rows:
+                legacy_transform(dict(row))
+
+        benchmarks.append((legacy_name, legacy))
+    benchmarks.extend([
+        ('transform_row', transform_row),
+        ('transform_row_columns', transform_row_columns),
+        ('csv_records', csv_records),
+        ('csv_records_columnar', csv_records_columnar),
+        ('process_records', process)
+    ])
+    return benchmarks, len(rows)
+
+
+def run_benchmark(function, rows, repeat, min_time):
+    rates = []
+    for _ in range(repeat):
+        loops = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            function()
+            loops = loops + 1
+            elapsed = time.perf_counter() - start
+        rates.append(rows * loops / elapsed)
+
+    tracemalloc.start()
+    function()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'rows': rows,
+        'rows_per_sec': round(max(rates), 1),
+        'rows_per_sec_median': round(statistics.median(rates), 1),
+        'peak_alloc_bytes': peak_bytes,
+        'peak_alloc_bytes_per_row': round(peak_bytes / rows, 1) if rows else None
+    }
+
+
+def get_git_commit():
+    try:
+        return subprocess.run(
+            ['git', '-C', BENCHMARKS_PATH, 'rev-parse', '--short', 'HEAD'],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True
+        ).stdout.decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    catalog = discover()
+    set_writer(MessageWriter(output=NullOutput()))
+    results = []
+    for stream_name, file_name, content in get_fixtures():
+        benchmarks, rows = get_benchmarks(catalog, stream_name, file_name, content)
+        for name, function in benchmarks:
+            if args.filter and args.filter not in name:
+                continue
+            result = {'benchmark': name, 'stream': stream_name, 'fixture': file_name}
+            result.update(run_benchmark(function, rows, args.repeat, args.min_time))
+            results.append(result)
+            sys.stderr.write('{:<32} {:<45} {:>12,.0f} rows/sec {:>10,} bytes peak\n'.format(
+                name, '{}/{}'.format(stream_name, file_name), result['rows_per_sec'],
+                result['peak_alloc_bytes']))
+    return {
+        'git_commit': get_git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'repeat': args.repeat,
+        'min_time': args.min_time,
+        'results': results
+    }
+
+
+# Compare rows/sec w/ previous results; returns the number of regressions
+def compare(report, baseline, threshold):
+    baseline_results = {}
+    for result in baseline.get('results', []):
+        baseline_results[(result['benchmark'], result['stream'], result['fixture'])] = result
+    regressions = 0
+    for result in report['results']:
+        key = (result['benchmark'], result['stream'], result['fixture'])
+        previous = baseline_results.get(key)
+        if not previous or not previous.get('rows_per_sec'):
+            continue
+        change = result['rows_per_sec'] / previous['rows_per_sec'] - 1
+        result['baseline_rows_per_sec'] = previous['rows_per_sec']
+        result['change'] = round(change, 4)
+        flag = ''
+        if change < -threshold:
+            regressions = regressions + 1
+            flag = ' REGRESSION'
+        sys.stderr.write('{:<32} {:<45} {:>+8.1%}{}\n'.format(
+            result['benchmark'], '{}/{}'.format(result['stream'], result['fixture']),
+            change, flag))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='tap-covid-19 micro-benchmarks')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.2, help='min seconds per run')
+    parser.add_argument('--filter', help='run benchmarks w/ names containing this string')
+    parser.add_argument('--output', help='write results (JSON) to this file; default stdout')
+    parser.add_argument('--compare', help='previous results (JSON) to compare with')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='max rows/sec slow-down for --compare; default 0.1 (10%%)')
+    args = parser.parse_args()
+
+    # Metrics and info logs are not part of the benchmarks
+    logging.disable(logging.INFO)
+
+    report = run(args)
+    regressions = 0
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(report, json.load(file), args.threshold)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+
+# Local stand-in (fake) of the GitHub API endpoints used by the tap, for load tests w/o network
+#   (see load_test.py). Serves a synthetic corpus of csv files for each stream's repository:
+#   GET /user
+#   GET /search/code?q=...+repo:<owner>/<repo>&page=N&per_page=M: Link pagination (next, last),
+#       results capped at --search-max-results (1,000 on GitHub)
+#   GET /repos/<owner>/<repo>/contents/<path>?ref=: JSON w/ base64 content, or the raw body
+#       (Accept: application/vnd.github.v3.raw); Last-Modified, and 304 for If-Modified-Since
+#   GET /repos/<owner>/<repo>/git/trees/<ref>[:<path>]?recursive=1: the repository or a folder
+#       (paths relative to the folder); truncated after --tree-max-entries entries
+#   GET /repos/<owner>/<repo>/tarball/<ref>: gzipped tar, w/ all mtimes = the head commit
+#       date-time (same as GitHub; not the last change of each file)
+#   POST /graphql: repository(owner, name) { object(expression) { ... on Commit { <alias>:
+#       history(first: 1, path: $<variable>) { nodes { committedDate } } } } } (only these fields)
+#   GET /_stats: requests (by endpoint and status), injected errors, rate limited; not counted
+#       (?reset=1 resets the counts)
+# Rate limits: X-RateLimit-* headers w/ separate core and code_search budgets (fixed windows,
+#   X-RateLimit-Resource named as on GitHub);
+#   403 when a budget is exhausted. Latency (--latency-ms, --jitter-ms), and injected 5xx
+#   (--error-rate) and 429 w/ Retry-After (--throttle-rate) responses are random (seeded).
+# Corpus: --files csv files per repository, from the fixtures (benchmarks/fixtures): JH CSSE
+#   daily reports from 01-22-2020 (header generation by date, --rows rows per file) and Italy
+#   dati-regioni daily files from 2020-02-24; counts vary by file (each file has its own sha).
+# Usage (prints the base URL, then serves until interrupted):
+#   > python benchmarks/fake_github.py --port 8000 --files 1000 --latency-ms 50
+
+import io
+import os
+import csv
+import sys
+import json
+import time
+import gzip
+import base64
+import re
+import random
+import hashlib
+import tarfile
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlencode, urlsplit
+
+BENCHMARKS_PATH = os.path.dirname(os.path.realpath(__file__))
+FIXTURES_PATH = os.path.join(BENCHMARKS_PATH, 'fixtures')
+
+HTTP_DATE_FMT = '%a, %d %b %Y %H:%M:%S GMT'
+# GraphQL: aliased history fields of the query (alias, path variable)
+HISTORY_FIELD_REGEX = re.compile(r'(\w+): history\(first: 1, path: \$(\w+)\)')
+TREE_SHA = '0' * 40
+ARCHIVE_SHA = 'abc1234'
+
+# Repository, folder, file names (by date), first date, and fixture templates (by first date)
+REPOSITORIES = {
+    'CSSEGISandData/COVID-19': {
+        'tree_path': 'csse_covid_19_data/csse_covid_19_daily_reports',
+        'file_name': '{:%m-%d-%Y}.csv',
+        'first_date': datetime(2020, 1, 22, tzinfo=timezone.utc),
+        'templates': [
+            (datetime(2020, 1, 22, tzinfo=timezone.utc), 'jh_csse_daily/01-22-2020.csv'),
+            (datetime(2020, 3, 1, tzinfo=timezone.utc), 'jh_csse_daily/03-01-2020.csv'),
+            (datetime(2020, 3, 22, tzinfo=timezone.utc), 'jh_csse_daily/03-23-2020.csv')
+        ]
+    },
+    'pcm-dpc/COVID-19': {
+        'tree_path': 'dati-regioni',
+        'file_name': 'dpc-covid19-ita-regioni-{:%Y%m%d}.csv',
+        'first_date': datetime(2020, 2, 24, tzinfo=timezone.utc),
+        'templates': [
+            (datetime(2020, 2, 24, tzinfo=timezone.utc),
+             'italy_daily_region/dpc-covid19-ita-regioni-20200326.csv')
+        ]
+    }
+}
+
+# Columns w/ counts (varied by file)
+COUNT_COLUMNS = [
+    'Confirmed', 'Deaths', 'Recovered', 'Active', 'ricoverati_con_sintomi', 'terapia_intensiva',
+    'totale_ospedalizzati', 'isolamento_domiciliare', 'totale_attualmente_positivi',
+    'nuovi_attualmente_positivi', 'dimessi_guariti', 'deceduti', 'totale_casi', 'tamponi'
+]
+
+
+def get_blob_sha(content):
+    blob = hashlib.sha1()
+    blob.update('blob {}\0'.format(len(content)).encode('utf-8'))
+    blob.update(content)
+    return blob.hexdigest()
+
+
+def read_template(fixture):
+    with open(os.path.join(FIXTURES_PATH, fixture), newline='') as file:
+        rows = list(csv.reader(file))
+    return rows[0], rows[1:]
+
+
+# Synthetic file content: template rows (up to max_rows) w/ counts offset by the file index
+def make_content(header, rows, index, date, max_rows):
+    count_indexes = [i for i, column in enumerate(header) if column in COUNT_COLUMNS]
+    date_index = header.index('data') if 'data' in header else None
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(header)
+    for row in rows[:max_rows]:
+        row = list(row)
+        for i in count_indexes:
+            if row[i].isdigit():
+                row[i] = str(int(row[i]) + index)
+        if date_index is not None:
+            row[date_index] = '{:%Y-%m-%d}T17:00:00'.format(date)
+        writer.writerow(row)
+    return output.getvalue().encode('utf-8')
+
+
+# Corpus: repository -> [file dict (path, content, sha, last_modified)], sorted by path
+def make_corpus(files, max_rows):
+    corpus = {}
+    for repository, config in REPOSITORIES.items():
+        templates = [(start, read_template(fixture)) for start, fixture in config['templates']]
+        repo_files = []
+        for index in range(files):
+            date = config['first_date'] + timedelta(days=index)
+            header, rows = [template for start, template in templates if start <= date][-1]
+            content = make_content(header, rows, index, date, max_rows)
+            repo_files.append({
+                'path': '{}/{}'.format(config['tree_path'], config['file_name'].format(date)),
+                'content': content,
+                'sha': get_blob_sha(content),
+                # Committed the day after the report date
+                'last_modified': date + timedelta(days=1)
+            })
+        corpus[repository] = sorted(repo_files, key=lambda repo_file: repo_file['path'])
+    return corpus
+
+
+class FakeGitHub(object):
+    def __init__(self, args):
+        self.args = args
+        self.corpus = make_corpus(args.files, args.rows)
+        self.files = {}
+        for repository, repo_files in self.corpus.items():
+            for repo_file in repo_files:
+                self.files[(repository, repo_file['path'])] = repo_file
+        self.random = random.Random(args.seed)
+        self.lock = threading.Lock()
+        # resource -> [limit, remaining, reset (epoch seconds)]
+        self.budgets = {}
+        self.archives = {}
+        self.stats = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {
+                'requests': 0,
+                'by_endpoint': {},
+                'by_status': {},
+                'injected_errors': 0,
+                'injected_throttles': 0,
+                'rate_limited': 0,
+                'not_modified': 0,
+                'bytes_sent': 0
+            }
+
+    def count(self, endpoint, status, size):
+        with self.lock:
+            self.stats['requests'] = self.stats['requests'] + 1
+            by_endpoint = self.stats['by_endpoint']
+            by_endpoint[endpoint] = by_endpoint.get(endpoint, 0) + 1
+            by_status = self.stats['by_status']
+            by_status[str(status)] = by_status.get(str(status), 0) + 1
+            self.stats['bytes_sent'] = self.stats['bytes_sent'] + size
+            if status == 304:
+                self.stats['not_modified'] = self.stats['not_modified'] + 1
+
+    def add_stat(self, name):
+        with self.lock:
+            self.stats[name] = self.stats[name] + 1
+
+    def get_stats(self):
+        with self.lock:
+            return json.loads(json.dumps(self.stats))
+
+    # Take one request from the resource budget; returns (rate limit headers, limited)
+    def take_budget(self, resource):
+        limit = self.args.search_limit if resource == 'code_search' else self.args.core_limit
+        window = self.args.search_window if resource == 'code_search' else self.args.core_window
+        with self.lock:
+            now = time.time()
+            budget = self.budgets.get(resource)
+            if budget is None or budget[2] <= now:
+                budget = [limit, limit, int(now + window)]
+                self.budgets[resource] = budget
+            limited = budget[1] <= 0
+            if not limited:
+                budget[1] = budget[1] - 1
+            headers = {
+                'X-RateLimit-Limit': str(budget[0]),
+                'X-RateLimit-Remaining': str(budget[1]),
+                'X-RateLimit-Reset': str(budget[2]),
+                'X-RateLimit-Resource': resource
+            }
+        return headers, limited
+
+    # Random delay, injected 5xx, and injected 429 of a request
+    def get_fault(self):
+        with self.lock:
+            delay = (self.args.latency_ms + self.random.uniform(0, self.args.jitter_ms)) / 1000.0
+            draw = self.random.random()
+        fault = None
+        if draw < self.args.error_rate:
+            fault = 'error'
+        elif draw < self.args.error_rate + self.args.throttle_rate:
+            fault = 'throttle'
+        return delay, fault
+
+    def get_archive(self, repository):
+        with self.lock:
+            archive = self.archives.get(repository)
+            if archive is None:
+                archive = self.make_archive(repository)
+                self.archives[repository] = archive
+            return archive
+
+    def make_archive(self, repository):
+        prefix = '{}-{}'.format(repository.replace('/', '-'), ARCHIVE_SHA)
+        # Head commit: the last file change
+        commit_time = int(max(repo_file['last_modified']
+                              for repo_file in self.corpus[repository]).timestamp())
+        output = io.BytesIO()
+        with gzip.GzipFile(fileobj=output, mode='wb', mtime=0) as gzip_file:
+            with tarfile.open(fileobj=gzip_file, mode='w') as tar:
+                folders = set()
+                for repo_file in self.corpus[repository]:
+                    folder = repo_file['path'].rsplit('/', 1)[0]
+                    parts = folder.split('/')
+                    for i in range(1, len(parts) + 1):
+                        name = '/'.join(parts[:i])
+                        if name not in folders:
+                            folders.add(name)
+                            info = tarfile.TarInfo('{}/{}'.format(prefix, name))
+                            info.type = tarfile.DIRTYPE
+                            info.mode = 0o755
+                            info.mtime = commit_time
+                            tar.addfile(info)
+                    info = tarfile.TarInfo('{}/{}'.format(prefix, repo_file['path']))
+                    info.size = len(repo_file['content'])
+                    info.mtime = commit_time
+                    tar.addfile(info, io.BytesIO(repo_file['content']))
+        return output.getvalue()
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    # Keep-alive connections (Content-Length on every response)
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeGitHub/1.0'
+    # Headers and body are separate writes; w/o TCP_NODELAY, each response waits for a delayed ACK
+    disable_nagle_algorithm = True
+    # POST request body (JSON)
+    request_json = {}
+
+    def log_message(self, format, *args): # pylint: disable=redefined-builtin
+        if self.server.fake.args.verbose:
+            super().log_message(format, *args)
+
+    def get_base_url(self):
+        return 'http://{}'.format(self.headers.get('Host'))
+
+    def send(self, endpoint, status, body=b'', headers=None, count=True):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode('utf-8')
+            headers = dict(headers or {})
+            headers.setdefault('Content-Type', 'application/json; charset=utf-8')
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+        if count:
+            self.server.fake.count(endpoint, status, len(body))
+
+    def do_GET(self): # pylint: disable=invalid-name
+        fake = self.server.fake
+        url = urlsplit(self.path)
+        path = unquote(url.path)
+        params = parse_qs(url.query)
+
+        if path == '/_stats':
+            stats = fake.get_stats()
+            if params.get('reset'):
+                fake.reset_stats()
+            self.send('stats', 200, stats, count=False)
+            return
+
+        route = self.get_route(path)
+        if route is None:
+            self.send('not_found', 404, {'message': 'Not Found'})
+            return
+        endpoint, handler, route_args = route
+
+        delay, fault = fake.get_fault()
+        if delay > 0:
+            time.sleep(delay)
+        resource = {'search': 'code_search', 'graphql': 'graphql'}.get(endpoint, 'core')
+        headers, limited = fake.take_budget(resource)
+        if limited:
+            fake.add_stat('rate_limited')
+            self.send(endpoint, 403, {'message': 'API rate limit exceeded'}, headers)
+            return
+        if fault == 'error':
+            fake.add_stat('injected_errors')
+            self.send(endpoint, fake.random.choice([500, 502, 503]),
+                      {'message': 'Server Error'}, headers)
+            return
+        if fault == 'throttle':
+            fake.add_stat('injected_throttles')
+            headers['Retry-After'] = str(fake.args.retry_after)
+            self.send(endpoint, 429, {'message': 'You have triggered an abuse detection '
+                                                 'mechanism.'}, headers)
+            return
+        handler(endpoint, headers, params, *route_args)
+
+    # Same as GET, w/ the request body (JSON) read first
+    def do_POST(self): # pylint: disable=invalid-name
+        length = int(self.headers.get('Content-Length') or 0)
+        self.request_json = json.loads(self.rfile.read(length).decode('utf-8') or '{}')
+        self.do_GET()
+
+    # (endpoint, handler, handler args) for a path; None if not found
+    def get_route(self, path):
+        if path == '/user':
+            return 'user', self.get_user, []
+        if path == '/search/code':
+            return 'search', self.get_search, []
+        if path == '/graphql' and self.command == 'POST':
+            return 'graphql', self.post_graphql, []
+        parts = path.strip('/').split('/', 4)
+        if len(parts) < 5 or parts[0] != 'repos':
+            return None
+        repository = '{}/{}'.format(parts[1], parts[2])
+        if repository not in self.server.fake.corpus:
+            return None
+        if parts[3] == 'contents':
+            return 'contents', self.get_contents, [repository, parts[4]]
+        if parts[3] == 'tarball':
+            return 'tarball', self.get_tarball, [repository]
+        if parts[3] == 'git' and parts[4].startswith('trees/'):
+            return 'trees', self.get_tree, [repository, parts[4][len('trees/'):]]
+        return None
+
+    def get_user(self, endpoint, headers, params):
+        self.send(endpoint, 200, {'login': 'fake-user', 'id': 1, 'type': 'User'}, headers)
+
+    def get_search(self, endpoint, headers, params):
+        fake = self.server.fake
+        query = params.get('q', [''])[0]
+        repository = None
+        for term in query.split():
+            if term.startswith('repo:'):
+                repository = term[len('repo:'):]
+        repo_files = fake.corpus.get(repository, [])[:fake.args.search_max_results]
+        page = int(params.get('page', ['1'])[0])
+        per_page = min(int(params.get('per_page', ['30'])[0]), 100)
+        last_page = max((len(repo_files) + per_page - 1) // per_page, 1)
+        base_url = self.get_base_url()
+        items = []
+        for repo_file in repo_files[(page - 1) * per_page:page * per_page]:
+            items.append(self.get_item(base_url, repository, repo_file))
+            items[-1]['score'] = 1.0
+
+        links = []
+        for rel, link_page in [('prev', page - 1), ('next', page + 1), ('last', last_page),
+                               ('first', 1)]:
+            if (rel == 'prev' and page <= 1) or (rel in ('next', 'last') and page >= last_page) \
+                or (rel == 'first' and page <= 1):
+                continue
+            link_params = dict((key, values[0]) for key, values in params.items())
+            link_params['page'] = link_page
+            links.append('<{}/search/code?{}>; rel="{}"'.format(
+                base_url, urlencode(link_params), rel))
+        if links:
+            headers['Link'] = ', '.join(links)
+        self.send(endpoint, 200, {
+            'total_count': len(repo_files),
+            'incomplete_results': False,
+            'items': items
+        }, headers)
+
+    def get_item(self, base_url, repository, repo_file):
+        quoted_path = quote(repo_file['path'])
+        return {
+            'name': repo_file['path'].split('/')[-1],
+            'path': repo_file['path'],
+            'sha': repo_file['sha'],
+            'url': '{}/repos/{}/contents/{}?ref=master'.format(base_url, repository, quoted_path),
+            'git_url': '{}/repos/{}/git/blobs/{}'.format(base_url, repository, repo_file['sha']),
+            'html_url': 'https://github.com/{}/blob/master/{}'.format(repository, quoted_path),
+            'repository': {'full_name': repository}
+        }
+
+    def get_contents(self, endpoint, headers, params, repository, file_path):
+        repo_file = self.server.fake.files.get((repository, file_path))
+        if repo_file is None:
+            self.send(endpoint, 404, {'message': 'Not Found'}, headers)
+            return
+        last_modified = repo_file['last_modified']
+        headers['Last-Modified'] = last_modified.strftime(HTTP_DATE_FMT)
+        headers['ETag'] = '"{}"'.format(repo_file['sha'])
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = datetime.strptime(if_modified_since, HTTP_DATE_FMT).replace(
+                    tzinfo=timezone.utc)
+            except ValueError:
+                since = None
+            if since and last_modified <= since:
+                self.send(endpoint, 304, b'', headers)
+                return
+
+        if 'raw' in self.headers.get('Accept', ''):
+            headers['Content-Type'] = 'application/vnd.github.v3.raw'
+            self.send(endpoint, 200, repo_file['content'], headers)
+            return
+        item = self.get_item(self.get_base_url(), repository, repo_file)
+        item.pop('repository')
+        item.update({
+            'size': len(repo_file['content']),
+            'download_url': 'https://raw.githubusercontent.com/{}/master/{}'.format(
+                repository, quote(repo_file['path'])),
+            'type': 'file',
+            'content': base64.encodebytes(repo_file['content']).decode('ascii'),
+            'encoding': 'base64',
+            '_links': {'self': item['url'], 'git': item['git_url'], 'html': item['html_url']}
+        })
+        self.send(endpoint, 200, item, headers)
+
+    # tree_ish: <ref> or <ref>:<folder path>
+    def get_tree(self, endpoint, headers, params, repository, tree_ish):
+        base_url = self.get_base_url()
+        tree_path = tree_ish.split(':', 1)[1].strip('/') if ':' in tree_ish else ''
+        prefix = tree_path + '/' if tree_path else ''
+        tree = []
+        folders = set()
+        for repo_file in self.server.fake.corpus[repository]:
+            if not repo_file['path'].startswith(prefix):
+                continue
+            path = repo_file['path'][len(prefix):]
+            parts = path.split('/')[:-1]
+            for i in range(1, len(parts) + 1):
+                folder = '/'.join(parts[:i])
+                if folder not in folders:
+                    folders.add(folder)
+                    tree.append({'path': folder, 'mode': '040000', 'type': 'tree',
+                                 'sha': TREE_SHA, 'url': '{}/repos/{}/git/trees/{}'.format(
+                                     base_url, repository, TREE_SHA)})
+            tree.append({
+                'path': path,
+                'mode': '100644',
+                'type': 'blob',
+                'sha': repo_file['sha'],
+                'size': len(repo_file['content']),
+                'url': '{}/repos/{}/git/blobs/{}'.format(base_url, repository, repo_file['sha'])
+            })
+        if not tree and tree_path:
+            self.send(endpoint, 404, {'message': 'Not Found'}, headers)
+            return
+        max_entries = self.server.fake.args.tree_max_entries
+        truncated = bool(max_entries) and len(tree) > max_entries
+        if truncated:
+            tree = tree[:max_entries]
+        self.send(endpoint, 200, {'sha': TREE_SHA, 'tree': tree, 'truncated': truncated},
+                  headers)
+
+    # Last commit date-time of each path (history aliases) at the head of the repository
+    def post_graphql(self, endpoint, headers, params):
+        fake = self.server.fake
+        variables = self.request_json.get('variables') or {}
+        repository = '{}/{}'.format(variables.get('owner'), variables.get('name'))
+        if repository not in fake.corpus:
+            self.send(endpoint, 200, {'data': {'repository': None}, 'errors': [{
+                'type': 'NOT_FOUND',
+                'message': "Could not resolve to a Repository with the name '{}'.".format(
+                    repository)}]}, headers)
+            return
+        commit = {}
+        for alias, variable in HISTORY_FIELD_REGEX.findall(self.request_json.get('query', '')):
+            repo_file = fake.files.get((repository, variables.get(variable)))
+            nodes = []
+            if repo_file:
+                nodes.append({
+                    'committedDate': repo_file['last_modified'].strftime('%Y-%m-%dT%H:%M:%SZ')})
+            commit[alias] = {'nodes': nodes}
+        self.send(endpoint, 200, {'data': {'repository': {'object': commit}}}, headers)
+
+    def get_tarball(self, endpoint, headers, params, repository):
+        headers['Content-Type'] = 'application/x-gzip'
+        self.send(endpoint, 200, self.server.fake.get_archive(repository), headers)
+
+
+class FakeGitHubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    # The tap closes error responses w/o reading them (connection reset); not an error here
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Local stand-in of the GitHub API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0, help='default: any free port')
+    parser.add_argument('--files', type=int, default=1000, help='csv files per repository')
+    parser.add_argument('--rows', type=int, default=200, help='max rows per JH CSSE file')
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='fraction of requests w/ a 500, 502 or 503 response')
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help='fraction of requests w/ a 429 (Retry-After) response')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds')
+    parser.add_argument('--core-limit', type=int, default=5000)
+    parser.add_argument('--core-window', type=int, default=3600, help='seconds')
+    parser.add_argument('--search-limit', type=int, default=30)
+    parser.add_argument('--search-window', type=int, default=60, help='seconds')
+    parser.add_argument('--search-max-results', type=int, default=1000)
+    parser.add_argument('--tree-max-entries', type=int, default=100000,
+                        help='max entries of a tree listing (truncated); 0 = no limit')
+    parser.add_argument('--seed', type=int, default=2020)
+    parser.add_argument('--verbose', action='store_true', help='log requests')
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    server = FakeGitHubServer((args.host, args.port), FakeGitHubHandler)
+    server.fake = FakeGitHub(args)
+    # First line of stdout: base URL (read by load_test.py)
+    sys.stdout.write('http://{}:{}\n'.format(*server.server_address[:2]))
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
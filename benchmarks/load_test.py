@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+# Load test: runs sync() (in this process) against the local stand-in of the GitHub API
+#   (fake_github.py, started in a subprocess), w/o network. Reports, for each run: wall time,
+#   requests made (by endpoint and status, from the fake), records and records/sec, new vs.
+#   reused connections, and peak RSS (of this process, i.e. the tap).
+# All streams are selected; the tap config is {api_token, start_date, user_agent} updated w/
+#   --config (e.g. max_concurrent_fetches, list_modes, raw_downloads, cache_path). State is
+#   carried over between runs (--runs 2: the second run is incremental, e.g. 304s).
+# Fake options (files, latency, rate limits, 5xx/429 injection) are passed through, e.g.:
+#   > python benchmarks/load_test.py --files 2000 --latency-ms 50 --jitter-ms 50 \
+#       --error-rate 0.01 --config '{"max_concurrent_fetches": 8, "raw_downloads": true}'
+#   Run python benchmarks/fake_github.py --help for the fake options.
+# Output: JSON report on stdout (or --output); the tap's log (INFO) is disabled w/o --log.
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import resource
+import subprocess
+import urllib.request
+
+BENCHMARKS_PATH = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_PATH))
+
+# pylint: disable=wrong-import-position
+from singer.catalog import Catalog
+from tap_covid_19 import get_pool_size
+from tap_covid_19.client import GitClient
+from tap_covid_19.discover import discover
+from tap_covid_19.sync import sync
+
+RECORD_PREFIXES = (b'{"type": "RECORD"', b'{"type":"RECORD"')
+STATE_PREFIXES = (b'{"type": "STATE"', b'{"type":"STATE"')
+
+
+# Replaces stdout for sync(): counts RECORD messages and keeps the last STATE
+class MessageCounter(object):
+    def __init__(self):
+        self.records = 0
+        self.bytes = 0
+        self.state = None
+        self.__tail = b''
+
+    @property
+    def buffer(self):
+        return self
+
+    def write(self, data):
+        self.bytes = self.bytes + len(data)
+        lines = (self.__tail + data).split(b'\n')
+        self.__tail = lines.pop()
+        for line in lines:
+            if line.startswith(RECORD_PREFIXES):
+                self.records = self.records + 1
+            elif line.startswith(STATE_PREFIXES):
+                self.state = json.loads(line.decode('utf-8')).get('value')
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def get_catalog():
+    catalog = discover().to_dict()
+    for stream in catalog['streams']:
+        for metadata in stream['metadata']:
+            if not metadata['breadcrumb']:
+                metadata['metadata']['selected'] = True
+    return Catalog.from_dict(catalog)
+
+
+def start_fake(fake_args):
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BENCHMARKS_PATH, 'fake_github.py')] + fake_args,
+        stdout=subprocess.PIPE)
+    base_url = process.stdout.readline().decode('utf-8').strip()
+    if not base_url:
+        process.wait()
+        raise Exception('fake_github.py failed to start (exit code {})'.format(
+            process.returncode))
+    return process, base_url
+
+
+def get_fake_stats(base_url):
+    with urllib.request.urlopen('{}/_stats?reset=1'.format(base_url)) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def get_peak_rss():
+    # ru_maxrss: kilobytes on Linux, bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss if sys.platform == 'darwin' else peak_rss * 1024
+
+
+def run_sync(base_url, config, catalog, state):
+    counter = MessageCounter()
+    stdout = sys.stdout
+    sys.stdout = counter
+    try:
+        with GitClient(api_token=config['api_token'],
+                       user_agent=config['user_agent'],
+                       pool_size=get_pool_size(config),
+                       base_url=base_url) as client:
+            start = time.perf_counter()
+            sync(client=client, config=config, catalog=catalog, state=state)
+            wall_seconds = time.perf_counter() - start
+            connections = client.get_connection_stats()
+    finally:
+        sys.stdout = stdout
+    return {
+        'wall_seconds': round(wall_seconds, 3),
+        'records': counter.records,
+        'records_per_sec': round(counter.records / wall_seconds, 1) if wall_seconds else None,
+        'output_bytes': counter.bytes,
+        'connections': connections,
+        'peak_rss_bytes': get_peak_rss()
+    }, counter.state or state
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='tap-covid-19 load test w/ a local stand-in of the GitHub API; '
+                    'other options are passed to fake_github.py')
+    parser.add_argument('--config', default='{}',
+                        help='tap config (JSON, or a JSON file) merged w/ the defaults')
+    parser.add_argument('--runs', type=int, default=1, help='sync runs; state is carried over')
+    parser.add_argument('--output', help='write the report (JSON) to this file; default stdout')
+    parser.add_argument('--log', action='store_true', help='keep the tap log (INFO)')
+    args, fake_args = parser.parse_known_args()
+
+    config = {
+        'api_token': 'fake-token',
+        'start_date': '2020-01-01T00:00:00Z',
+        'user_agent': 'tap-covid-19 load test'
+    }
+    if os.path.isfile(args.config):
+        with open(args.config) as file:
+            config.update(json.load(file))
+    else:
+        config.update(json.loads(args.config))
+    if not args.log:
+        logging.disable(logging.INFO)
+
+    process, base_url = start_fake(fake_args)
+    try:
+        catalog = get_catalog()
+        state = {}
+        runs = []
+        for run in range(args.runs):
+            result, state = run_sync(base_url, config, catalog, state)
+            result['run'] = run + 1
+            result['requests'] = get_fake_stats(base_url)
+            runs.append(result)
+            sys.stderr.write(
+                'Run {run}: {wall_seconds}s, {records} records, {records_per_sec} records/sec, '
+                '{requests[requests]} requests, peak RSS {peak_rss_bytes:,} bytes\n'.format(
+                    **result))
+    finally:
+        process.terminate()
+        process.wait()
+
+    report = {
+        'fake_args': fake_args,
+        'config': dict((key, value) for key, value in config.items() if key != 'api_token'),
+        'runs': runs
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+
+# Generates the benchmark fixtures (checked in): CSV files shaped like the source repositories.
+#   Deterministic (seeded); re-run only to change the fixtures:
+#   > python benchmarks/make_fixtures.py
+# JH CSSE daily reports, one file per header generation (see transform.py):
+#   01-22-2020.csv: Initial header, M/D/YYYY H:MM dates, blank counts
+#   03-01-2020.csv: + Latitude, Longitude; ISO dates, "City, ST" provinces, cruise ships
+#   03-23-2020.csv: county-level (FIPS, Admin2, ...); M/D/YY H:MM and YYYY-MM-DD H:M:S dates
+# Italy (dati-regioni): one daily file per region set, w/ Italian column names
+
+import os
+import csv
+import random
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'fixtures')
+
+STATES = [
+    ('Alabama', 'AL'), ('Alaska', 'AK'), ('Arizona', 'AZ'), ('Arkansas', 'AR'),
+    ('California', 'CA'), ('Colorado', 'CO'), ('Connecticut', 'CT'), ('Delaware', 'DE'),
+    ('Florida', 'FL'), ('Georgia', 'GA'), ('Hawaii', 'HI'), ('Idaho', 'ID'),
+    ('Illinois', 'IL'), ('Indiana', 'IN'), ('Iowa', 'IA'), ('Kansas', 'KS'),
+    ('Kentucky', 'KY'), ('Louisiana', 'LA'), ('Maine', 'ME'), ('Maryland', 'MD'),
+    ('Massachusetts', 'MA'), ('Michigan', 'MI'), ('Minnesota', 'MN'), ('Mississippi', 'MS'),
+    ('Missouri', 'MO'), ('Montana', 'MT'), ('Nebraska', 'NE'), ('Nevada', 'NV'),
+    ('New Hampshire', 'NH'), ('New Jersey', 'NJ'), ('New Mexico', 'NM'), ('New York', 'NY'),
+    ('North Carolina', 'NC'), ('North Dakota', 'ND'), ('Ohio', 'OH'), ('Oklahoma', 'OK'),
+    ('Oregon', 'OR'), ('Pennsylvania', 'PA'), ('Rhode Island', 'RI'), ('South Carolina', 'SC'),
+    ('South Dakota', 'SD'), ('Tennessee', 'TN'), ('Texas', 'TX'), ('Utah', 'UT'),
+    ('Vermont', 'VT'), ('Virginia', 'VA'), ('Washington', 'WA'), ('West Virginia', 'WV'),
+    ('Wisconsin', 'WI'), ('Wyoming', 'WY')
+]
+
+CHINA_PROVINCES = [
+    'Anhui', 'Beijing', 'Chongqing', 'Fujian', 'Gansu', 'Guangdong', 'Guangxi', 'Guizhou',
+    'Hainan', 'Hebei', 'Heilongjiang', 'Henan', 'Hubei', 'Hunan', 'Inner Mongolia', 'Jiangsu',
+    'Jiangxi', 'Jilin', 'Liaoning', 'Ningxia', 'Qinghai', 'Shaanxi', 'Shandong', 'Shanghai',
+    'Shanxi', 'Sichuan', 'Tianjin', 'Tibet', 'Xinjiang', 'Yunnan', 'Zhejiang'
+]
+
+COUNTRIES = [
+    'Afghanistan', 'Albania', 'Algeria', 'Andorra', 'Argentina', 'Armenia', 'Austria',
+    'Azerbaijan', 'Bahrain', 'Belarus', 'Belgium', 'Bosnia and Herzegovina', 'Brazil',
+    'Bulgaria', 'Cambodia', 'Chile', 'Colombia', 'Costa Rica', "Cote d'Ivoire", 'Croatia',
+    'Cyprus', 'Czechia', 'Denmark', 'Dominican Republic', 'Ecuador', 'Egypt', 'Estonia',
+    'Finland', 'Georgia', 'Germany', 'Greece', 'Hungary', 'Iceland', 'India', 'Indonesia',
+    'Iran', 'Iraq', 'Ireland', 'Israel', 'Italy', 'Japan', 'Jordan', 'Korea South', 'Kuwait',
+    'Latvia', 'Lebanon', 'Lithuania', 'Luxembourg', 'Malaysia', 'Mexico', 'Monaco', 'Morocco',
+    'Nepal', 'Netherlands', 'New Zealand', 'Nigeria', 'North Macedonia', 'Norway', 'Oman',
+    'Pakistan', 'Peru', 'Philippines', 'Poland', 'Portugal', 'Qatar', 'Romania', 'Russia',
+    'San Marino', 'Saudi Arabia', 'Senegal', 'Singapore', 'Slovakia', 'Slovenia',
+    'South Africa', 'Spain', 'Sri Lanka', 'Sweden', 'Switzerland', 'Taiwan*', 'Thailand',
+    'Tunisia', 'Turkey', 'Ukraine', 'United Arab Emirates', 'United Kingdom', 'Uruguay',
+    'Vietnam'
+]
+
+ITALY_REGIONS = [
+    (13, 'Abruzzo', 42.35122196, 13.39843823), (17, 'Basilicata', 40.63947052, 15.80514834),
+    (4, 'P.A. Bolzano', 46.49933453, 11.35662422), (18, 'Calabria', 38.90597598, 16.59440194),
+    (15, 'Campania', 40.83956555, 14.25084984), (8, 'Emilia-Romagna', 44.49436681, 11.3417208),
+    (6, 'Friuli Venezia Giulia', 45.6494354, 13.76813649), (12, 'Lazio', 41.89277044, 12.48366722),
+    (7, 'Liguria', 44.41149315, 8.9326992), (3, 'Lombardia', 45.46679409, 9.190347404),
+    (11, 'Marche', 43.61675973, 13.5188753), (14, 'Molise', 41.55774754, 14.65916051),
+    (1, 'Piemonte', 45.0732745, 7.680687483), (16, 'Puglia', 41.12559576, 16.86736689),
+    (20, 'Sardegna', 39.21531192, 9.110616306), (19, 'Sicilia', 38.11569725, 13.3623567),
+    (9, 'Toscana', 43.76923077, 11.25588885), (4, 'P.A. Trento', 46.06893511, 11.12123097),
+    (10, 'Umbria', 43.10675841, 12.38824698), (2, "Valle d'Aosta", 45.73750286, 7.320149366),
+    (5, 'Veneto', 45.43490485, 12.33845213)
+]
+
+SYLLABLES = ['ab', 'an', 'bel', 'ber', 'car', 'clay', 'dal', 'ford', 'gal', 'ham', 'jef',
+             'kin', 'lin', 'mar', 'mont', 'nor', 'ot', 'pol', 'ran', 'sal', 'ston', 'ton',
+             'ville', 'wash', 'wood']
+
+
+def county_name(rand):
+    return ''.join(rand.choice(SYLLABLES) for _ in range(rand.randint(2, 3))).title()
+
+
+def count(rand, scale, blank=0.0):
+    if rand.random() < blank:
+        return ''
+    return str(int(rand.expovariate(1.0 / scale)))
+
+
+def write_csv(path, header, rows):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file, lineterminator='\n')
+        writer.writerow(header)
+        writer.writerows(rows)
+    print('{}: {} rows'.format(os.path.relpath(path, FIXTURES_PATH), len(rows)))
+
+
+def make_jh_initial(rand, path):
+    header = ['Province/State', 'Country/Region', 'Last Update', 'Confirmed', 'Deaths',
+              'Recovered']
+    rows = []
+    for province in CHINA_PROVINCES:
+        rows.append([province, 'Mainland China', '1/22/2020 17:00', count(rand, 20, 0.1),
+                     count(rand, 1, 0.8), count(rand, 1, 0.8)])
+    for province, country in [('Hong Kong', 'Hong Kong'), ('Macau', 'Macau'),
+                              ('Taiwan', 'Taiwan'), ('Washington', 'US'),
+                              ('Chicago, IL', 'US')]:
+        rows.append([province, country, '1/22/2020 17:00', '1', '', ''])
+    for country in ['Japan', 'Thailand', 'South Korea']:
+        rows.append(['', country, '1/22/2020 17:00', count(rand, 2), '', ''])
+    write_csv(path, header, rows)
+
+
+def make_jh_latitude(rand, path):
+    header = ['Province/State', 'Country/Region', 'Last Update', 'Confirmed', 'Deaths',
+              'Recovered', 'Latitude', 'Longitude']
+    rows = []
+
+    def last_update():
+        return '2020-03-01T{:02d}:{:02d}:{:02d}'.format(
+            rand.randint(0, 23), rand.randint(0, 59), rand.randint(0, 59))
+
+    def coordinate(value):
+        return '{:.4f}'.format(value + rand.uniform(-3, 3))
+
+    for province in CHINA_PROVINCES:
+        rows.append([province, 'Mainland China', last_update(), count(rand, 1000),
+                     count(rand, 10), count(rand, 500), coordinate(32.0), coordinate(112.0)])
+    for state, state_code in STATES[:12]:
+        rows.append(['{} County, {}'.format(county_name(rand), state_code), 'US', last_update(),
+                     count(rand, 3), '0', '0', coordinate(38.0), coordinate(-97.0)])
+    rows.append(['Diamond Princess cruise ship', 'Others', last_update(), '705', '6', '10',
+                 '35.4437', '139.6380'])
+    rows.append(['Grand Princess', 'US', last_update(), '21', '0', '0', '37.6489', '-122.6655'])
+    for country in COUNTRIES:
+        rows.append(['', country, last_update(), count(rand, 50), count(rand, 2),
+                     count(rand, 5), coordinate(20.0), coordinate(20.0)])
+    rows.append(['', 'Washington', last_update(), '0', '0', '0', '0.0', '0.0'])
+    write_csv(path, header, rows)
+
+
+def make_jh_county(rand, path):
+    header = ['FIPS', 'Admin2', 'Province_State', 'Country_Region', 'Last_Update', 'Lat',
+              'Long_', 'Confirmed', 'Deaths', 'Recovered', 'Active', 'Combined_Key']
+    rows = []
+    for state_index, (state, state_code) in enumerate(STATES):
+        for county_index in range(65):
+            county = county_name(rand)
+            confirmed = count(rand, 40)
+            deaths = count(rand, 1)
+            fips = '{}{:03d}'.format(state_index + 1, county_index * 2 + 1)
+            rows.append([fips, county, state, 'US', '3/23/20 23:19',
+                         '{:.8f}'.format(rand.uniform(25, 49)),
+                         '{:.8f}'.format(rand.uniform(-124, -67)),
+                         confirmed, deaths, '0', str(int(confirmed) - int(deaths)),
+                         '{}, {}, US'.format(county, state)])
+        rows.append(['', 'Unassigned', state, 'US', '3/23/20 23:19', '0.0', '0.0',
+                     count(rand, 5), '0', '0', '0', 'Unassigned, {}, US'.format(state)])
+    for province in CHINA_PROVINCES:
+        rows.append(['', '', province, 'China', '2020-03-23 23:19:34',
+                     '{:.4f}'.format(rand.uniform(22, 45)), '{:.4f}'.format(rand.uniform(90, 125)),
+                     count(rand, 1000), count(rand, 10), count(rand, 900), count(rand, 50),
+                     '{}, China'.format(province)])
+    rows.append(['', '', 'Diamond Princess', 'Canada', '2020-03-23 23:19:34', '0.0', '0.0',
+                 '0', '1', '0', '-1', 'Diamond Princess, Canada'])
+    for country in COUNTRIES:
+        rows.append(['', '', '', country, '2020-03-23 23:19:34',
+                     '{:.5f}'.format(rand.uniform(-40, 60)), '{:.5f}'.format(rand.uniform(-100, 140)),
+                     count(rand, 500), count(rand, 20), count(rand, 50), count(rand, 400), country])
+    write_csv(path, header, rows)
+
+
+def make_italy_regions(rand, path, date):
+    header = ['data', 'stato', 'codice_regione', 'denominazione_regione', 'lat', 'long',
+              'ricoverati_con_sintomi', 'terapia_intensiva', 'totale_ospedalizzati',
+              'isolamento_domiciliare', 'totale_attualmente_positivi',
+              'nuovi_attualmente_positivi', 'dimessi_guariti', 'deceduti', 'totale_casi',
+              'tamponi', 'note_it', 'note_en']
+    rows = []
+    for code, region, lat, lon in ITALY_REGIONS:
+        hospitalized = int(rand.expovariate(1.0 / 800))
+        intensive = int(hospitalized * rand.uniform(0.05, 0.2))
+        isolation = int(rand.expovariate(1.0 / 1500))
+        positive = hospitalized + intensive + isolation
+        recovered = int(rand.expovariate(1.0 / 400))
+        deaths = int(rand.expovariate(1.0 / 300))
+        note_it = 'dati non pervenuti' if rand.random() < 0.05 else ''
+        rows.append(['{}T17:00:00'.format(date), 'ITA', code, region, lat, lon,
+                     hospitalized, intensive, hospitalized + intensive, isolation, positive,
+                     int(rand.expovariate(1.0 / 100)), recovered, deaths,
+                     positive + recovered + deaths, int(rand.expovariate(1.0 / 8000)),
+                     note_it, 'data not received' if note_it else ''])
+    write_csv(path, header, rows)
+
+
+def main():
+    rand = random.Random(2020)
+    jh_path = os.path.join(FIXTURES_PATH, 'jh_csse_daily')
+    make_jh_initial(rand, os.path.join(jh_path, '01-22-2020.csv'))
+    make_jh_latitude(rand, os.path.join(jh_path, '03-01-2020.csv'))
+    make_jh_county(rand, os.path.join(jh_path, '03-23-2020.csv'))
+    italy_path = os.path.join(FIXTURES_PATH, 'italy_daily_region')
+    for date in ['2020-03-25', '2020-03-26']:
+        make_italy_regions(rand, os.path.join(
+            italy_path, 'dpc-covid19-ita-regioni-{}.csv'.format(date.replace('-', ''))), date)
+
+
+if __name__ == '__main__':
+    main()
@@ -13,6 +13,9 @@ setup(name='tap-covid-19',
           'requests==2.23.0',
           'singer-python==5.9.0'
       ],
+      extras_require={
+          'orjson': ['orjson']
+      },
       entry_points='''
           [console_scripts]
           tap-covid-19=tap_covid_19:main
@@ -20,6 +23,7 @@ setup(name='tap-covid-19',
       packages=find_packages(),
       package_data={
           'tap_covid_19': [
-              'schemas/*.json'
+              'schemas/*.json',
+              'catalog.json'
           ]
       })
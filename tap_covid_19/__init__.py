@@ -1,13 +1,8 @@
 #!/usr/bin/env python3
 
 import sys
-import json
 import argparse
 import singer
-from singer import metadata, utils
-from tap_covid_19.client import GitClient
-from tap_covid_19.discover import discover
-from tap_covid_19.sync import sync
 
 LOGGER = singer.get_logger()
 
@@ -17,33 +12,60 @@ REQUIRED_CONFIG_KEYS = [
     'user_agent'
 ]
 
-def do_discover():
+# Discover mode is offline: the precompiled catalog is written w/o a GitClient (or token check).
+#   requests and the sync modules are only imported for sync mode (fast start-up).
+def parse_discover_args():
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('-c', '--config')
+    parser.add_argument('-d', '--discover', action='store_true')
+    args, _ = parser.parse_known_args()
+    return args
 
-    LOGGER.info('Starting discover')
-    catalog = discover()
-    json.dump(catalog.to_dict(), sys.stdout, indent=2)
-    LOGGER.info('Finished discover')
 
+# Concurrent requests: files fetched in parallel by each of the streams synced in parallel
+def get_pool_size(config):
+    return int(config.get('parallel_streams', 1)) * int(config.get('max_concurrent_fetches', 1))
+
+
+def do_discover():
+    from tap_covid_19.discover import get_catalog_json
+    sys.stdout.write(get_catalog_json())
+    sys.stdout.flush()
 
-@singer.utils.handle_top_exception(LOGGER)
-def main():
+
+def do_sync():
+    from tap_covid_19.client import GitClient
+    from tap_covid_19.sync import sync
 
     parsed_args = singer.utils.parse_args(REQUIRED_CONFIG_KEYS)
 
+    if parsed_args.discover:
+        do_discover()
+        return
+
+    # Authentication is checked w/ the first API request
     with GitClient(api_token=parsed_args.config['api_token'],
-                   user_agent=parsed_args.config['user_agent']) as client:
+                   user_agent=parsed_args.config['user_agent'],
+                   pool_size=get_pool_size(parsed_args.config)) as client:
 
         state = {}
         if parsed_args.state:
             state = parsed_args.state
 
-        if parsed_args.discover:
-            do_discover()
-        elif parsed_args.catalog:
+        if parsed_args.catalog:
             sync(client=client,
                  config=parsed_args.config,
                  catalog=parsed_args.catalog,
                  state=state)
 
+
+@singer.utils.handle_top_exception(LOGGER)
+def main():
+    discover_args = parse_discover_args()
+    if discover_args.discover and discover_args.config:
+        do_discover()
+    else:
+        do_sync()
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,80 @@
+import hashlib
+import tarfile
+import threading
+import singer
+
+LOGGER = singer.get_logger()
+
+# Repository archive (tarball) of a ref, read as a stream (not extracted to disk)
+#   Entries are <owner>-<repo>-<short sha>/<path>, in git tree order: byte-wise order of the
+#   full paths, the same order as the (recursive) Git Trees listing. Files are read in that
+#   order; entries not read are skipped in the stream.
+#   Entry mtimes are the commit date-time of the ref (not the last change of each file).
+# Reference: https://developer.github.com/v3/repos/contents/#get-archive-link
+
+
+# Git blob sha of a file content: https://git-scm.com/book/en/v2/Git-Internals-Git-Objects
+def get_blob_sha(content):
+    blob = hashlib.sha1()
+    blob.update('blob {}\0'.format(len(content)).encode('utf-8'))
+    blob.update(content)
+    return blob.hexdigest()
+
+
+class ArchiveReader(object):
+    # open_archive: function returning the streaming archive response (requested on first read)
+    def __init__(self, open_archive):
+        self.open_archive = open_archive
+        self.__lock = threading.Lock()
+        self.__response = None
+        self.__tar = None
+        self.__pending = None
+        self.__done = False
+        self.files = 0
+
+    def next_member(self):
+        if self.__pending is not None:
+            member = self.__pending
+            self.__pending = None
+            return member
+        member = self.__tar.next()
+        # Stream mode: members are not needed after they are passed
+        self.__tar.members = []
+        return member
+
+    # Content (bytes) of a file (path); None if the path is not in the archive (or was requested
+    #   out of order)
+    def read(self, path):
+        with self.__lock:
+            if self.__done:
+                return None
+            if self.__tar is None:
+                self.__response, _ = self.open_archive()
+                if self.__response is None:
+                    self.__done = True
+                    return None
+                self.__tar = tarfile.open(fileobj=self.__response.raw, mode='r|gz')
+
+            while True:
+                member = self.next_member()
+                if member is None:
+                    self.close()
+                    return None
+                # Remove the top-level folder (<owner>-<repo>-<short sha>)
+                member_path = member.name.split('/', 1)[-1]
+                if not member.isfile() or member_path < path:
+                    continue
+                if member_path > path:
+                    # Path not in the archive; keep the member for the next read
+                    self.__pending = member
+                    return None
+                content = self.__tar.extractfile(member).read()
+                self.files = self.files + 1
+                return content
+
+    def close(self):
+        self.__done = True
+        if self.__tar is not None:
+            self.__tar.close()
+        if self.__response is not None:
+            self.__response.close()
@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+from singer.utils import strptime_to_utc
+
+# Date-time format of conformed records (singer.utils.strftime)
+DATETIME_FMT = '%Y-%m-%dT%H:%M:%S.%fZ'
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+# Date-time string to epoch microseconds (integer)
+def to_epoch(value):
+    try:
+        dttm = datetime.strptime(value, DATETIME_FMT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        dttm = strptime_to_utc(value)
+    delta = dttm - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+# Bookmark for an INCREMENTAL stream (replication_keys in STREAMS)
+#   The lower bound (last_datetime from the state or start_date) is parsed once; the running
+#   max is kept as epoch microseconds, and the value (string) is only used for the state.
+class Bookmark(object):
+    def __init__(self, bookmark_field, last_datetime):
+        self.bookmark_field = bookmark_field
+        self.last_datetime = last_datetime
+        self.last_epoch = to_epoch(last_datetime)
+        self.max_epoch = self.last_epoch
+        # Bookmark value for the state: last_datetime until a record has a higher bookmark
+        self.value = last_datetime
+
+    # Update the max bookmark with a (conformed) record value;
+    #   returns True if the record is not before the lower bound (the record should be written)
+    def update(self, record_value):
+        if record_value is None:
+            return True
+        epoch = to_epoch(record_value)
+        # Reset max bookmark value to new value if higher
+        if epoch > self.max_epoch:
+            self.max_epoch = epoch
+            self.value = record_value
+        # Keep only records whose bookmark is after the last_datetime
+        return epoch >= self.last_epoch
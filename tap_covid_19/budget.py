@@ -0,0 +1,93 @@
+import threading
+import time
+import singer
+from singer import metrics
+
+LOGGER = singer.get_logger()
+
+# Memory budget (max_buffer_mb) for the files fetched ahead of emission: decoded file contents
+#   and (parse_processes) their parsed csv records, shared by the streams synced in parallel.
+#   A file is reserved w/ an estimate before it is fetched (tree size, or the average size of
+#   the stream's files so far), adjusted to its actual size when fetched, and released once it
+#   is processed. Producers pause (no new fetches) while the budget is full; one file is always
+#   allowed when nothing is reserved, so a file larger than the budget is still synced.
+# Parsed csv records (dicts) take about 10x the csv content bytes (benchmarks/bench.py)
+PARSED_RECORDS_FACTOR = 10
+
+# Estimated file size before any file of a stream is fetched (search items have no size)
+DEFAULT_FILE_SIZE = 256 * 1024
+
+
+class MemoryBudget(object):
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.__condition = threading.Condition()
+        self.__used = 0
+        # Peak usage and producer wait time, since the metrics were last logged
+        self.__peak = 0
+        self.__wait_seconds = 0.0
+        self.__waits = 0
+        # stream_name -> [total size, files]
+        self.__file_sizes = {}
+
+    # Reserve size bytes; wait (or return False w/o wait) until they fit in the budget
+    def acquire(self, size, wait=True):
+        with self.__condition:
+            if self.__used > 0 and self.__used + size > self.max_bytes:
+                if not wait:
+                    return False
+                start = time.perf_counter()
+                self.__waits = self.__waits + 1
+                while self.__used > 0 and self.__used + size > self.max_bytes:
+                    self.__condition.wait()
+                self.__wait_seconds = self.__wait_seconds + time.perf_counter() - start
+            self.__used = self.__used + size
+            self.__peak = max(self.__peak, self.__used)
+            return True
+
+    # Change a reservation (estimate -> actual size)
+    def adjust(self, size_change):
+        with self.__condition:
+            self.__used = self.__used + size_change
+            self.__peak = max(self.__peak, self.__used)
+            if size_change < 0:
+                self.__condition.notify_all()
+
+    def release(self, size):
+        with self.__condition:
+            self.__used = self.__used - size
+            self.__condition.notify_all()
+
+    def get_usage(self):
+        with self.__condition:
+            return self.__used
+
+    def estimate_file_size(self, stream_name, item):
+        if item.get('size'):
+            return item.get('size')
+        with self.__condition:
+            total_size, files = self.__file_sizes.get(stream_name, (0, 0))
+        return total_size // files if files else DEFAULT_FILE_SIZE
+
+    def add_file_size(self, stream_name, size):
+        with self.__condition:
+            file_sizes = self.__file_sizes.setdefault(stream_name, [0, 0])
+            file_sizes[0] = file_sizes[0] + size
+            file_sizes[1] = file_sizes[1] + 1
+
+    # Usage metrics: current and peak usage, and producer waits, since the last log
+    def log_metrics(self, stream_name):
+        with self.__condition:
+            used, peak = self.__used, self.__peak
+            wait_seconds, waits = self.__wait_seconds, self.__waits
+            self.__peak = used
+            self.__wait_seconds = 0.0
+            self.__waits = 0
+        tags = {metrics.Tag.endpoint: stream_name, 'max_bytes': self.max_bytes}
+        metrics.log(LOGGER, metrics.Point('gauge', 'buffer_bytes', used,
+                                          dict(tags, usage='current')))
+        metrics.log(LOGGER, metrics.Point('gauge', 'buffer_bytes', peak,
+                                          dict(tags, usage='peak')))
+        if waits:
+            metrics.log(LOGGER, metrics.Point('timer', 'buffer_wait', round(wait_seconds, 6),
+                                              dict(tags, waits=waits)))
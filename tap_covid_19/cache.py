@@ -0,0 +1,115 @@
+import os
+import re
+import json
+import threading
+import tempfile
+from collections import OrderedDict
+import singer
+
+LOGGER = singer.get_logger()
+
+# Content-addressed, on-disk cache of file blobs keyed by git blob SHA.
+#   Each entry is a single file: <cache_path>/<sha[:2]>/<sha>
+#   Line 1: JSON blob metadata ({"last_modified": ...}); remainder: raw (decoded) content bytes
+#   Only the content is cached: a blob may be at several paths (e.g. a dated file and a copy of
+#   it as the latest file), so the file metadata (path, name, urls) comes from each listed item.
+#   Entries are evicted least-recently-used first once the total size exceeds max_size_mb.
+SHA_REGEX = re.compile(r'^[0-9a-f]{40}$')
+DEFAULT_MAX_SIZE_MB = 1024
+
+
+class BlobCache(object):
+    def __init__(self, cache_path, max_size_mb=None):
+        self.cache_path = cache_path
+        if max_size_mb is None:
+            max_size_mb = DEFAULT_MAX_SIZE_MB
+        self.max_size = int(float(max_size_mb) * 1024 * 1024)
+        self.total_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.__lock = threading.Lock()
+        # sha -> size, oldest access first
+        self.__entries = OrderedDict()
+        self.__load_index()
+
+    def __load_index(self):
+        os.makedirs(self.cache_path, exist_ok=True)
+        entries = []
+        for root, dirs, files in os.walk(self.cache_path):
+            for file_name in files:
+                if not SHA_REGEX.match(file_name):
+                    continue
+                stat = os.stat(os.path.join(root, file_name))
+                entries.append((stat.st_mtime, file_name, stat.st_size))
+        # Access time is tracked with mtime (touched on each hit)
+        for mtime, sha, size in sorted(entries):
+            self.__entries[sha] = size
+            self.total_size = self.total_size + size
+        LOGGER.info('Blob cache: {}, entries: {}, size: {} bytes'.format(
+            self.cache_path, len(self.__entries), self.total_size))
+
+    def __entry_path(self, sha):
+        return os.path.join(self.cache_path, sha[:2], sha)
+
+    # Returns (last_modified, content_bytes) or (None, None) when not cached
+    def get(self, sha):
+        if not sha or not SHA_REGEX.match(sha):
+            return None, None
+        with self.__lock:
+            if sha not in self.__entries:
+                self.misses = self.misses + 1
+                return None, None
+            self.__entries.move_to_end(sha)
+        entry_path = self.__entry_path(sha)
+        try:
+            with open(entry_path, 'rb') as file:
+                meta_line = file.readline()
+                content = file.read()
+            os.utime(entry_path)
+        except OSError:
+            # Removed outside of the tap (or evicted concurrently)
+            with self.__lock:
+                self.__discard(sha)
+                self.misses = self.misses + 1
+            return None, None
+        with self.__lock:
+            self.hits = self.hits + 1
+        try:
+            last_modified = json.loads(meta_line.decode('utf-8')).get('last_modified')
+        except (ValueError, AttributeError):
+            last_modified = None
+        return last_modified, content
+
+    def put(self, sha, content, last_modified=None):
+        if not sha or not SHA_REGEX.match(sha):
+            return
+        entry_path = self.__entry_path(sha)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        meta_line = json.dumps({'last_modified': last_modified}).encode('utf-8') + b'\n'
+        # Write to a temp file and rename, so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path))
+        with os.fdopen(fd, 'wb') as file:
+            file.write(meta_line)
+            file.write(content)
+        os.replace(tmp_path, entry_path)
+        size = len(meta_line) + len(content)
+        with self.__lock:
+            self.__discard(sha)
+            self.__entries[sha] = size
+            self.total_size = self.total_size + size
+            self.__evict()
+
+    def __discard(self, sha):
+        size = self.__entries.pop(sha, None)
+        if size is not None:
+            self.total_size = self.total_size - size
+
+    # Evict least-recently-used entries until the cache fits in max_size
+    def __evict(self):
+        while self.total_size > self.max_size and len(self.__entries) > 1:
+            sha, size = self.__entries.popitem(last=False)
+            self.total_size = self.total_size - size
+            try:
+                os.remove(self.__entry_path(sha))
+            except OSError:
+                pass
@@ -2,9 +2,11 @@ import re
 from datetime import datetime
 import backoff
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError
 import singer
-from singer import metrics, utils
+from singer import metrics
+from tap_covid_19.ratelimit import RateLimiter, get_resource
 
 LOGGER = singer.get_logger()
 
@@ -100,57 +102,87 @@ def raise_for_error(response):
             raise GitError(error)
 
 
+# Connection pool: https://requests.readthedocs.io/en/master/api/#requests.adapters.HTTPAdapter
+#   pool_size: max connections kept alive per host (>= concurrent requests: parallel streams x
+#       concurrent fetches, so none are discarded)
+#   POOL_HOSTS: number of host pools (api.github.com, codeload, raw content)
+DEFAULT_POOL_SIZE = 10
+POOL_HOSTS = 4
+
+DEFAULT_BASE_URL = 'https://api.github.com'
+
+
 class GitClient(object):
     def __init__(self,
                  api_token,
-                 user_agent=None):
+                 user_agent=None,
+                 pool_size=None,
+                 base_url=None):
         self.__api_token = api_token
-        self.base_url = "https://api.github.com"
+        # base_url: API root URL, e.g. a local stand-in of the API (benchmarks/fake_github.py)
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
         self.__user_agent = user_agent
-        self.__session = requests.Session()
-        self.__verified = False
+        self.__session = self.get_session(pool_size)
+        self.rate_limiter = RateLimiter()
+
+    # Session w/ a sized keep-alive pool and headers sent w/ every request
+    def get_session(self, pool_size=None):
+        pool_size = max(pool_size or 0, DEFAULT_POOL_SIZE)
+        adapter = HTTPAdapter(
+            pool_connections=POOL_HOSTS,
+            pool_maxsize=pool_size)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        # API Version: https://developer.github.com/v3/#current-version
+        session.headers['Accept'] = 'application/vnd.github.v3+json'
+        # Compression: JSON responses are gzipped (decompressed by requests)
+        session.headers['Accept-Encoding'] = 'gzip'
+        # Authentication: https://developer.github.com/v3/#authentication
+        if self.__api_token is not None:
+            session.headers['Authorization'] = 'Token {}'.format(self.__api_token)
+        if self.__user_agent:
+            session.headers['User-Agent'] = self.__user_agent
+        return session
 
+    # Authentication is checked by the first request (401 raises GitUnauthorizedError),
+    #   not w/ an extra request
     def __enter__(self):
-        self.__verified = self.check_access()
         return self
 
     def __exit__(self, exception_type, exception_value, traceback):
+        self.log_connection_stats()
         self.__session.close()
 
-    @backoff.on_exception(backoff.expo,
-                          Server5xxError,
-                          max_tries=5,
-                          factor=2)
-    def check_access(self):
-        if self.__api_token is None:
-            raise Exception('Error: Missing api_token in config.json.')
-        headers = {}
-        # Endpoint: simple API call to return a single record (current User) to test access
-        url = 'https://api.github.com/user'
-        if self.__user_agent:
-            headers['User-Agent'] = self.__user_agent
-        headers['Accept'] = 'application/vnd.github.v3+json'
-        # Authentication: https://developer.github.com/v3/#authentication
-        headers['Authorization'] = 'Token {}'.format(self.__api_token)
-        response = self.__session.get(
-            url=url,
-            headers=headers)
-        if response.status_code != 200:
-            LOGGER.error('Error status_code = {}'.format(response.status_code))
-            raise_for_error(response)
-        else:
-            return True
-
+    # Connection reuse: new connections (TCP/TLS handshakes) vs. requests on kept-alive connections
+    def get_connection_stats(self):
+        connections = 0
+        requests_sent = 0
+        for adapter in set(self.__session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                connections = connections + pool.num_connections
+                requests_sent = requests_sent + pool.num_requests
+        return {
+            'new': connections,
+            'reused': max(requests_sent - connections, 0)
+        }
+
+    def log_connection_stats(self):
+        for connection, value in self.get_connection_stats().items():
+            with metrics.Counter('http_connections', {'connection': connection}) as counter:
+                counter.increment(value)
 
     @backoff.on_exception(backoff.expo,
                           (Server5xxError, ConnectionError, Server429Error),
                           max_tries=7,
                           factor=3)
-    # Rate Limiting: https://developer.github.com/v3/#rate-limiting
-    @utils.ratelimit(5000, 3600)
     def request(self, method, url=None, path=None, headers=None, json=None, version=None, **kwargs):
-        if not self.__verified:
-            self.__verified = self.check_access()
+        if self.__api_token is None:
+            raise Exception('Error: Missing api_token in config.json.')
 
         if not url and path:
             url = '{}/{}'.format(self.base_url, path)
@@ -161,22 +193,30 @@ class GitClient(object):
         else:
             endpoint = None
 
-        if not headers:
-            headers = {}
+        # raw: return the (streaming) response for the file body instead of JSON
+        raw = kwargs.pop('raw', False)
 
+        # Accept, Authorization and User-Agent are session headers; only a different
+        #   API version or media type is set per request (w/o changing the caller's headers)
         # API Version: https://developer.github.com/v3/#current-version
         if not version:
             version = 'v3'
-        headers['Accept'] = 'application/vnd.github.{}+json'.format(version)
-
-        # Authentication: https://developer.github.com/v3/#authentication
-        headers['Authorization'] = 'Token {}'.format(self.__api_token)
-
-        if self.__user_agent:
-            headers['User-Agent'] = self.__user_agent
-
-        if method == 'POST':
-            headers['Content-Type'] = 'application/json'
+        accept = None
+        if raw:
+            # Raw media type: https://developer.github.com/v3/repos/contents/#custom-media-types
+            accept = 'application/vnd.github.{}.raw'.format(version)
+        elif version != 'v3':
+            accept = 'application/vnd.github.{}+json'.format(version)
+        if accept or method == 'POST':
+            headers = dict(headers or {})
+            if accept:
+                headers['Accept'] = accept
+            if method == 'POST':
+                headers['Content-Type'] = 'application/json'
+
+        # Rate Limiting: https://developer.github.com/v3/#rate-limiting
+        resource = get_resource(url)
+        self.rate_limiter.wait(resource)
 
         with metrics.http_request_timer(endpoint) as timer:
             response = self.__session.request(
@@ -187,23 +227,34 @@ class GitClient(object):
                 **kwargs)
             timer.tags[metrics.Tag.http_status_code] = response.status_code
 
+        # Rate limited (403/429): retry after the budget reset or Retry-After
+        if self.rate_limiter.update(resource, response):
+            response.close()
+            raise Server429Error()
+
         if response.status_code >= 500:
             raise Server5xxError()
 
         # 304: File Not Modified status_code
         if response.status_code == 304:
+            response.close()
             return None, None
 
         if response.status_code != 200:
             raise_for_error(response)
 
+        # last-modified: https://developer.github.com/v3/#conditional-requests
         last_modified = response.headers.get('Last-Modified')
+        if last_modified:
+            last_modified_dttm = datetime.strptime(last_modified, '%a, %d %b %Y %H:%M:%S %Z')
+            last_modified = last_modified_dttm.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        if raw:
+            return response, last_modified
 
         response_json = response.json()
-        # last-modified: https://developer.github.com/v3/#conditional-requests
         if last_modified:
-            last_modified_dttm = datetime.strptime(last_modified, '%a, %d %b %Y %H:%M:%S %Z')
-            response_json['last_modified'] = last_modified_dttm.strftime("%Y-%m-%dT%H:%M:%SZ")
+            response_json['last_modified'] = last_modified
 
         # Pagination: https://developer.github.com/v3/guides/traversing-with-pagination/
         links_header = response.headers.get('Link')
@@ -213,7 +264,7 @@ class GitClient(object):
             links = links_header.split(',')
         for link in links:
             try:
-                url, rel = re.search(r'^\<(https.*)\>; rel\=\"(.*)\"$', link.strip()).groups()
+                url, rel = re.search(r'^\<(https?.*)\>; rel\=\"(.*)\"$', link.strip()).groups()
                 if rel == 'next':
                     next_url = url
             except AttributeError:
@@ -224,5 +275,28 @@ class GitClient(object):
     def get(self, url=None, path=None, headers=None, **kwargs):
         return self.request('GET', url=url, path=path, headers=headers, **kwargs)
 
+    # Returns the streaming response with the raw file body and the Last-Modified date-time
+    def get_raw(self, url=None, path=None, headers=None, **kwargs):
+        return self.request('GET', url=url, path=path, headers=headers, raw=True, stream=True,
+                            **kwargs)
+
+    # Repository archive (tarball) of a ref, streaming (redirected to codeload.github.com)
+    # Reference: https://developer.github.com/v3/repos/contents/#get-archive-link
+    def get_archive(self, repository, ref, **kwargs):
+        return self.get_raw(path='repos/{}/tarball/{}'.format(repository, ref), **kwargs)
+
     def post(self, url=None, path=None, headers=None, **kwargs):
         return self.request('POST', url=url, path=path, headers=headers, **kwargs)
+
+    # GraphQL API query: returns the data; errors in the response raise GitError
+    # Reference: https://developer.github.com/v4/guides/forming-calls/
+    def graphql(self, query, variables=None, **kwargs):
+        response_json, _ = self.post(
+            path='graphql',
+            json={'query': query, 'variables': variables or {}},
+            **kwargs)
+        errors = (response_json or {}).get('errors')
+        if errors:
+            raise GitError('GraphQL error: {}'.format(
+                '; '.join(error.get('message', 'Unknown Error') for error in errors)))
+        return (response_json or {}).get('data') or {}
@@ -1,8 +1,23 @@
-from singer.catalog import Catalog, CatalogEntry, Schema
-from tap_covid_19.schema import get_schemas
-from tap_covid_19.streams import flatten_streams
+import os
+import sys
+import json
+
+# Precompiled catalog: catalog.json (discover output), built from schemas/*.json and STREAMS with:
+#   python -m tap_covid_19.discover
+# Discover mode reads it as is (no network, no schema/metadata compilation, no singer imports);
+#   the unit tests check that it is the same as the compiled catalog.
+CATALOG_FILE = 'catalog.json'
+
+
+def get_abs_path(path):
+    return os.path.join(os.path.dirname(os.path.realpath(__file__)), path)
+
+
+def compile_catalog():
+    from singer.catalog import Catalog, CatalogEntry, Schema
+    from tap_covid_19.schema import get_schemas
+    from tap_covid_19.streams import flatten_streams
 
-def discover():
     schemas, field_metadata = get_schemas()
     catalog = Catalog([])
 
@@ -20,3 +35,24 @@ def discover():
         ))
 
     return catalog
+
+
+# Catalog JSON text (discover output)
+def get_catalog_json():
+    with open(get_abs_path(CATALOG_FILE)) as file:
+        return file.read()
+
+
+def discover():
+    from singer.catalog import Catalog
+    return Catalog.from_dict(json.loads(get_catalog_json()))
+
+
+def write_catalog():
+    with open(get_abs_path(CATALOG_FILE), 'w') as file:
+        json.dump(compile_catalog().to_dict(), file, indent=2)
+
+
+if __name__ == '__main__':
+    write_catalog()
+    sys.stdout.write('Wrote {}\n'.format(get_abs_path(CATALOG_FILE)))
@@ -0,0 +1,141 @@
+import sys
+import json
+import threading
+import pytz
+import singer
+from singer import utils
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LOGGER = singer.get_logger()
+
+# Default output buffer size (bytes), before a write to stdout
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+# Message encoders: message dict -> bytes (w/o newline)
+#   orjson (if installed) is much faster; stdlib json output is the same as singer-python's
+def encode_json(message):
+    return json.dumps(message).encode('utf-8')
+
+
+def encode_orjson(message):
+    try:
+        return orjson.dumps(message)
+    except TypeError:
+        # e.g. integers > 64 bit, Decimal
+        return encode_json(message)
+
+
+def get_encoder(name=None):
+    if name in (None, 'auto'):
+        name = 'orjson' if orjson else 'json'
+    if name == 'orjson':
+        if orjson is None:
+            LOGGER.warning('orjson is not installed, using json encoder')
+            return encode_json
+        return encode_orjson
+    return encode_json
+
+
+# Singer message writer (emitter) for the tap
+#   Messages are encoded into a buffer and written to stdout in large writes. The buffer is
+#   written when full and flushed on each STATE message, so RECORDs are always written before
+#   the STATE that follows them. Writes are locked, so streams synced in parallel threads
+#   write whole lines (messages of the streams are interleaved, each tagged w/ its stream).
+class MessageWriter(object):
+    # output: binary file object; default = stdout
+    def __init__(self, output=None, buffer_size=DEFAULT_BUFFER_SIZE, encoder=None):
+        self.text_output = False
+        if output is None:
+            # Anything already written to the sys.stdout text layer goes first
+            sys.stdout.flush()
+            output = getattr(sys.stdout, 'buffer', None)
+            if output is None:
+                # stdout replaced w/ a text stream (e.g. io.StringIO)
+                output = sys.stdout
+                self.text_output = True
+        self.output = output
+        self.buffer_size = buffer_size
+        self.encode = encoder or get_encoder()
+        self.buffer = []
+        self.buffered = 0
+        self.lock = threading.RLock()
+        # Formatted time_extracted (the same datetime is used for a page of records)
+        self.__time_extracted = (None, None)
+
+    # Returns the message size (bytes)
+    def write_message_dict(self, message):
+        line = self.encode(message) + b'\n'
+        with self.lock:
+            self.buffer.append(line)
+            self.buffered = self.buffered + len(line)
+            if self.buffered >= self.buffer_size:
+                self.write_buffer()
+        return len(line)
+
+    def write_record(self, stream_name, record, time_extracted=None):
+        message = {
+            'type': 'RECORD',
+            'stream': stream_name,
+            'record': record
+        }
+        if time_extracted:
+            with self.lock:
+                message['time_extracted'] = self.format_time_extracted(time_extracted)
+        return self.write_message_dict(message)
+
+    def write_schema(self, stream_name, schema, key_properties, bookmark_properties=None):
+        self.write_message_dict(singer.SchemaMessage(
+            stream=stream_name,
+            schema=schema,
+            key_properties=key_properties,
+            bookmark_properties=bookmark_properties).asdict())
+
+    def write_state(self, value):
+        with self.lock:
+            self.write_message_dict(singer.StateMessage(value=value).asdict())
+            self.flush()
+
+    def format_time_extracted(self, time_extracted):
+        last_time_extracted, formatted = self.__time_extracted
+        if time_extracted is not last_time_extracted:
+            formatted = utils.strftime(time_extracted.astimezone(pytz.utc))
+            self.__time_extracted = (time_extracted, formatted)
+        return formatted
+
+    def write_buffer(self):
+        with self.lock:
+            if self.buffer:
+                data = b''.join(self.buffer)
+                if self.text_output:
+                    data = data.decode('utf-8')
+                self.output.write(data)
+                self.buffer = []
+                self.buffered = 0
+
+    def flush(self):
+        with self.lock:
+            self.write_buffer()
+            self.output.flush()
+
+
+# Current message writer for the tap (set by sync from the config)
+WRITER = None
+
+
+def get_writer():
+    global WRITER #pylint: disable=global-statement
+    if WRITER is None:
+        WRITER = MessageWriter()
+    return WRITER
+
+
+def set_writer(writer):
+    global WRITER #pylint: disable=global-statement
+    if WRITER is not None:
+        WRITER.flush()
+    WRITER = writer
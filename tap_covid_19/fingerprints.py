@@ -0,0 +1,102 @@
+import os
+import json
+import uuid
+import hashlib
+import tempfile
+import zlib
+import singer
+
+LOGGER = singer.get_logger()
+
+# Row fingerprints of the csv files synced by a child stream, for row-level change detection.
+#   Local (sidecar) store, one entry per file: <store_path>/<stream_name>/<sha1(git path)>
+#   Entry: zlib compressed lines of <row key (JSON list of key_properties values)>\t<fingerprint>
+#   Fingerprint: 64-bit blake2b of the record (JSON), w/o the fields that change w/ every
+#   revision of a file (git_sha, git_last_modified).
+# New fingerprints are written as pending entries (.pending) and committed (renamed) after the
+#   state w/ the stream's manifest is written; an interrupted sync re-syncs the changed files
+#   against the last committed fingerprints.
+# Store id: random id of the store (<store_path>/store_id), kept in the state by stream; committed
+#   fingerprints are only compared w/ for a state that has the stream's manifest and the same
+#   store id (not after a state reset, or w/ a new store).
+FINGERPRINT_EXCLUDE_FIELDS = ['git_sha', 'git_last_modified']
+FINGERPRINT_SIZE = 8
+PENDING_SUFFIX = '.pending'
+STORE_ID_FILE = 'store_id'
+
+
+def get_row_key(record, key_properties):
+    return json.dumps([record.get(key) for key in key_properties], default=str)
+
+
+def get_row_fingerprint(record):
+    values = dict(record)
+    for field in FINGERPRINT_EXCLUDE_FIELDS:
+        values.pop(field, None)
+    data = json.dumps(values, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=FINGERPRINT_SIZE).hexdigest()
+
+
+class RowFingerprints(object):
+    def __init__(self, store_path):
+        self.store_path = store_path
+        # stream_name -> set of entry paths w/ pending fingerprints
+        self.__pending = {}
+        os.makedirs(self.store_path, exist_ok=True)
+        self.store_id = self.__load_store_id()
+
+    def __load_store_id(self):
+        store_id_path = os.path.join(self.store_path, STORE_ID_FILE)
+        try:
+            with open(store_id_path) as file:
+                store_id = file.read().strip()
+            if store_id:
+                return store_id
+        except FileNotFoundError:
+            pass
+        store_id = uuid.uuid4().hex
+        fd, tmp_path = tempfile.mkstemp(dir=self.store_path)
+        with os.fdopen(fd, 'w') as file:
+            file.write(store_id)
+        os.replace(tmp_path, store_id_path)
+        return store_id
+
+    def __entry_path(self, stream_name, path):
+        path_hash = hashlib.sha1(path.encode('utf-8')).hexdigest()
+        return os.path.join(self.store_path, stream_name, path_hash)
+
+    # Committed fingerprints of a file: row key -> fingerprint ({} if the file was not synced)
+    def get(self, stream_name, path):
+        fingerprints = {}
+        try:
+            with open(self.__entry_path(stream_name, path), 'rb') as file:
+                data = zlib.decompress(file.read()).decode('utf-8')
+        except FileNotFoundError:
+            return fingerprints
+        except (OSError, zlib.error) as err:
+            LOGGER.warning('Invalid row fingerprints for {}: {}, ignoring'.format(path, err))
+            return fingerprints
+        for line in data.split('\n'):
+            if line:
+                key, fingerprint = line.split('\t')
+                fingerprints[key] = fingerprint
+        return fingerprints
+
+    def put(self, stream_name, path, fingerprints):
+        entry_path = self.__entry_path(stream_name, path)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        lines = ['{}\t{}'.format(key, fingerprint) for key, fingerprint in fingerprints.items()]
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path))
+        with os.fdopen(fd, 'wb') as file:
+            file.write(zlib.compress('\n'.join(lines).encode('utf-8')))
+        os.replace(tmp_path, entry_path + PENDING_SUFFIX)
+        self.__pending.setdefault(stream_name, set()).add(entry_path)
+
+    # Commit the pending fingerprints of a stream (after its state is written)
+    def commit(self, stream_name):
+        entry_paths = self.__pending.pop(stream_name, set())
+        for entry_path in entry_paths:
+            os.replace(entry_path + PENDING_SUFFIX, entry_path)
+        if entry_paths:
+            LOGGER.info('Stream: {}, committed row fingerprints for {} files'.format(
+                stream_name, len(entry_paths)))
@@ -0,0 +1,117 @@
+import mmap
+import os
+import subprocess
+import threading
+from datetime import datetime, timezone
+import singer
+
+LOGGER = singer.get_logger()
+
+# Local git checkout (clone) of a stream's repository, instead of the GitHub API
+#   Files are listed from HEAD (git ls-tree) w/ the git blob sha and size, and last_modified
+#   from the last commit of each file (git log); same as the Git Trees listing and the
+#   contents API Last-Modified. File bodies are read from the working tree (memory-mapped
+#   when large), or from the object database for files modified in the working tree.
+# Reference: https://git-scm.com/docs/git-ls-tree, https://git-scm.com/docs/git-log
+MMAP_MIN_SIZE = 1024 * 1024
+
+# last_modified format of the client (Last-Modified response header)
+LAST_MODIFIED_FMT = '%Y-%m-%dT%H:%M:%SZ'
+
+# Commit marker in the git log output
+COMMIT_MARKER = '\x01'
+
+
+class LocalRepositoryError(Exception):
+    pass
+
+
+class LocalRepository(object):
+    def __init__(self, repo_path, ref='HEAD'):
+        self.repo_path = os.path.abspath(os.path.expanduser(repo_path))
+        self.ref = ref
+        self.__lock = threading.Lock()
+        # tree_path -> {path: last_modified}
+        self.__last_modified = {}
+        # tree_path -> set of paths modified in the working tree
+        self.__dirty_paths = {}
+
+    def git(self, *args):
+        command = ['git', '-C', self.repo_path, '-c', 'core.quotepath=off'] + list(args)
+        try:
+            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    check=True)
+        except (OSError, subprocess.CalledProcessError) as err:
+            stderr = getattr(err, 'stderr', None)
+            raise LocalRepositoryError('git {} failed for {}: {}'.format(
+                args[0], self.repo_path, stderr.decode('utf-8', 'replace') if stderr else err))
+        return result.stdout
+
+    # Blob entries (path, sha, size) under tree_path, same as a recursive Git Trees listing
+    def list_tree(self, tree_path):
+        entries = []
+        output = self.git('ls-tree', '-r', '-l', '-z', self.ref, '--', tree_path)
+        for line in output.decode('utf-8').split('\0'):
+            if not line:
+                continue
+            info, path = line.split('\t', 1)
+            mode, entry_type, sha, size = info.split()
+            entries.append({
+                'path': path,
+                'mode': mode,
+                'type': entry_type,
+                'sha': sha,
+                'size': int(size) if size.isdigit() else None
+            })
+        return entries
+
+    # Commit date-time of the last commit of each file under tree_path (one git log)
+    def get_last_modified(self, tree_path, path):
+        with self.__lock:
+            if tree_path not in self.__last_modified:
+                self.__last_modified[tree_path] = self.read_last_modified(tree_path)
+            return self.__last_modified[tree_path].get(path)
+
+    def read_last_modified(self, tree_path):
+        last_modified = {}
+        output = self.git('log', '-z', '--no-renames', '--name-only',
+                          '--format={}%ct'.format(COMMIT_MARKER), self.ref, '--', tree_path)
+        commit_datetime = None
+        for token in output.decode('utf-8').split('\0'):
+            token = token.strip('\n')
+            if not token:
+                continue
+            if token.startswith(COMMIT_MARKER):
+                commit_time = datetime.fromtimestamp(int(token[1:]), timezone.utc)
+                commit_datetime = commit_time.strftime(LAST_MODIFIED_FMT)
+            elif token not in last_modified:
+                # Log is newest first
+                last_modified[token] = commit_datetime
+        return last_modified
+
+    def is_dirty(self, tree_path, path):
+        with self.__lock:
+            if tree_path not in self.__dirty_paths:
+                self.__dirty_paths[tree_path] = self.read_dirty_paths(tree_path)
+            return path in self.__dirty_paths[tree_path]
+
+    def read_dirty_paths(self, tree_path):
+        dirty_paths = set()
+        output = self.git('status', '--porcelain', '-z', '--untracked-files=no', '--', tree_path)
+        for entry in output.decode('utf-8').split('\0'):
+            if len(entry) > 3:
+                dirty_paths.add(entry[3:])
+        if dirty_paths:
+            LOGGER.warning('Local repository {}: {} files modified in the working tree, '
+                           'reading them from {}'.format(self.repo_path, len(dirty_paths), self.ref))
+        return dirty_paths
+
+    # File content for a tree entry: bytes, or a read-only mmap (use_mmap) for large files
+    def read_file(self, tree_path, path, sha, use_mmap=False):
+        if self.ref != 'HEAD' or self.is_dirty(tree_path, path):
+            return self.git('cat-file', 'blob', sha)
+        file_path = os.path.join(self.repo_path, *path.split('/'))
+        with open(file_path, 'rb') as file:
+            if use_mmap and os.fstat(file.fileno()).st_size >= MMAP_MIN_SIZE:
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            return file.read()
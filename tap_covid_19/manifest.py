@@ -0,0 +1,56 @@
+import base64
+import zlib
+import singer
+
+LOGGER = singer.get_logger()
+
+# File manifest: path -> git blob sha for each file synced by a files stream.
+# Stored in the state as a compact string, so state messages stay small with thousands of paths:
+#   1. Paths are sorted and front-coded (length of prefix shared w/ previous path + suffix)
+#   2. SHAs are truncated to SHA_LENGTH hex chars (64 bits; plenty to detect a changed blob)
+#   3. Lines are zlib compressed and base64 encoded, with a version prefix
+MANIFEST_VERSION = 'z1:'
+SHA_LENGTH = 16
+
+
+def short_sha(sha):
+    if not sha:
+        return None
+    return sha[:SHA_LENGTH]
+
+
+def encode_manifest(manifest):
+    lines = []
+    prev_path = ''
+    for path in sorted(manifest):
+        prefix_len = 0
+        max_len = min(len(path), len(prev_path))
+        while prefix_len < max_len and path[prefix_len] == prev_path[prefix_len]:
+            prefix_len = prefix_len + 1
+        lines.append('{}\t{}\t{}'.format(prefix_len, path[prefix_len:], short_sha(manifest[path])))
+        prev_path = path
+    compressed = zlib.compress('\n'.join(lines).encode('utf-8'), 9)
+    return MANIFEST_VERSION + base64.b64encode(compressed).decode('ascii')
+
+
+def decode_manifest(value):
+    manifest = {}
+    if not value:
+        return manifest
+    if not value.startswith(MANIFEST_VERSION):
+        LOGGER.warning('Unknown manifest version, ignoring manifest')
+        return manifest
+    try:
+        data = zlib.decompress(base64.b64decode(value[len(MANIFEST_VERSION):])).decode('utf-8')
+    except (ValueError, zlib.error) as err:
+        LOGGER.warning('Invalid manifest, ignoring manifest: {}'.format(err))
+        return manifest
+    prev_path = ''
+    for line in data.split('\n'):
+        if not line:
+            continue
+        prefix_len, suffix, sha = line.split('\t')
+        path = prev_path[:int(prefix_len)] + suffix
+        manifest[path] = sha
+        prev_path = path
+    return manifest
@@ -0,0 +1,145 @@
+import threading
+import time
+import singer
+from singer import metrics
+
+LOGGER = singer.get_logger()
+
+# Phase timers and counters by stream (phase_metrics), for the hot paths of a sync:
+#   list: file listing requests (search pages, tree, local git), count = files listed
+#   fetch: file requests or reads, incl. decode; count = files, bytes = content bytes
+#       (fetched concurrently: seconds are summed across threads, may exceed the wall time;
+#       streamed raw bodies are downloaded during parse)
+#   decode: base64 decode of the contents API responses; count = files, bytes = decoded bytes
+#   parse: utf-8 decode and csv parsing; count = rows, bytes = content bytes
+#       (parse_processes: waiting for the worker results, incl. transform)
+#   transform: csv record transforms (transform.py); count = rows
+#   conform: schema conform (conform.py); count = records
+#   emit: encoding and writing the RECORD messages; count = records, bytes = message bytes
+# Reported as Singer metrics when each stream is synced (timer: phase_time, counters: phase_count,
+#   phase_bytes; tags: endpoint, phase) and as a summary at the end of the sync.
+# Disabled (default): no profiler is set; the hot paths check for it once per file or page.
+PHASES = ['list', 'fetch', 'decode', 'parse', 'transform', 'conform', 'emit']
+
+PHASE_UNITS = {
+    'list': 'files',
+    'fetch': 'files',
+    'decode': 'files',
+    'parse': 'rows',
+    'transform': 'rows',
+    'conform': 'records',
+    'emit': 'records'
+}
+
+
+# Timer for one phase of a stream, used by one thread; added to the profiler when closed
+class PhaseTimer(object):
+    def __init__(self, profiler, stream_name, phase):
+        self.profiler = profiler
+        self.stream_name = stream_name
+        self.phase = phase
+        self.seconds = 0.0
+        self.count = 0
+        self.bytes = 0
+        self.__start = None
+
+    def __enter__(self):
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.seconds = self.seconds + time.perf_counter() - self.__start
+
+    # Time each call of function (one count per call); result_bytes: function returns a size
+    def wrap(self, function, result_bytes=False):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            self.seconds = self.seconds + time.perf_counter() - start
+            self.count = self.count + 1
+            if result_bytes and result:
+                self.bytes = self.bytes + result
+            return result
+        return timed
+
+    # Time each item (next) of an iterable (one count per item; count_items: len(item))
+    def iterate(self, iterable, count_items=False):
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.seconds = self.seconds + time.perf_counter() - start
+                return
+            self.seconds = self.seconds + time.perf_counter() - start
+            self.count = self.count + (len(item) if count_items else 1)
+            yield item
+
+    def close(self):
+        self.profiler.add(self.stream_name, self.phase, self.seconds, self.count, self.bytes)
+
+
+class Profiler(object):
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__start = time.perf_counter()
+        # stream_name -> phase -> [seconds, count, bytes]
+        self.__stats = {}
+
+    def timer(self, stream_name, phase):
+        return PhaseTimer(self, stream_name, phase)
+
+    def add(self, stream_name, phase, seconds, count=0, size=0):
+        with self.__lock:
+            stats = self.__stats.setdefault(stream_name, {}).setdefault(phase, [0.0, 0, 0])
+            stats[0] = stats[0] + seconds
+            stats[1] = stats[1] + count
+            stats[2] = stats[2] + size
+
+    def get_stats(self, stream_name):
+        with self.__lock:
+            return dict((phase, list(stats))
+                        for phase, stats in self.__stats.get(stream_name, {}).items())
+
+    # Singer metrics for the phases of a stream
+    def log_metrics(self, stream_name):
+        for phase, (seconds, count, size) in sorted(
+                self.get_stats(stream_name).items(), key=lambda item: PHASES.index(item[0])):
+            tags = {metrics.Tag.endpoint: stream_name, 'phase': phase}
+            metrics.log(LOGGER, metrics.Point('timer', 'phase_time', round(seconds, 6), tags))
+            metrics.log(LOGGER, metrics.Point('counter', 'phase_count', count,
+                                              dict(tags, unit=PHASE_UNITS[phase])))
+            if size:
+                metrics.log(LOGGER, metrics.Point('counter', 'phase_bytes', size, tags))
+
+    # Summary table of all streams and phases (w/ the rate of each phase)
+    def log_summary(self):
+        wall_seconds = time.perf_counter() - self.__start
+        with self.__lock:
+            stream_names = sorted(self.__stats.keys())
+        lines = ['Phase summary (wall time: {:.3f}s):'.format(wall_seconds),
+                 '{:<24} {:<10} {:>10} {:>12} {:>14} {:>14}'.format(
+                     'stream', 'phase', 'seconds', 'count', 'bytes', 'count/sec')]
+        for stream_name in stream_names:
+            stats = self.get_stats(stream_name)
+            for phase in PHASES:
+                if phase not in stats:
+                    continue
+                seconds, count, size = stats[phase]
+                lines.append('{:<24} {:<10} {:>10.3f} {:>12,} {:>14,} {:>14,.0f}'.format(
+                    stream_name, phase, seconds, count, size, count / seconds if seconds else 0))
+        LOGGER.info('\n'.join(lines))
+
+
+# Current profiler for the tap (set by sync w/ phase_metrics); None if disabled
+PROFILER = None
+
+
+def get_profiler():
+    return PROFILER
+
+
+def set_profiler(profiler):
+    global PROFILER #pylint: disable=global-statement
+    PROFILER = profiler
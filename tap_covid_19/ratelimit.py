@@ -0,0 +1,83 @@
+import time
+import threading
+from urllib.parse import urlsplit
+import singer
+
+LOGGER = singer.get_logger()
+
+# Rate Limiting: https://developer.github.com/v3/#rate-limiting
+#   Separate budgets by resource: core (5,000 requests/hour), search (30 requests/minute) and
+#   code_search (10 requests/minute); GraphQL requests (graphql) are rate limited by points
+#   (5,000/hour). Resources of requests (from the URL) are named the same as
+#   the X-RateLimit-Resource header of their responses.
+#   Budgets are read from the X-RateLimit-* response headers; a request only waits when its
+#   resource budget is exhausted (until X-RateLimit-Reset) or after a Retry-After response.
+# Abuse rate limits: https://developer.github.com/v3/#abuse-rate-limits
+RESET_MARGIN_SECONDS = 1
+
+
+def get_resource(url):
+    path = urlsplit(url or '').path
+    if path.startswith('/search/code'):
+        return 'code_search'
+    if path.startswith('/search/'):
+        return 'search'
+    if path.endswith('/graphql'):
+        return 'graphql'
+    return 'core'
+
+
+class RateLimiter(object):
+    def __init__(self):
+        self.__lock = threading.Lock()
+        # resource -> [remaining, reset (epoch seconds)]
+        self.__budgets = {}
+        # Retry-After: no requests until (epoch seconds)
+        self.__retry_until = 0
+
+    # Wait (if needed) and take one request from the resource budget
+    def wait(self, resource):
+        with self.__lock:
+            now = time.time()
+            sleep_until = self.__retry_until
+            budget = self.__budgets.get(resource)
+            if budget:
+                remaining, reset = budget
+                if reset + RESET_MARGIN_SECONDS <= now:
+                    # Budget window has been reset; unknown until the next response
+                    del self.__budgets[resource]
+                elif remaining <= 0:
+                    sleep_until = max(sleep_until, reset + RESET_MARGIN_SECONDS)
+                else:
+                    budget[0] = remaining - 1
+        sleep_time = sleep_until - time.time()
+        if sleep_time > 0:
+            LOGGER.info('Rate limit: {}, sleeping {:.1f} seconds'.format(resource, sleep_time))
+            time.sleep(sleep_time)
+
+    # Update the budget from the response headers; returns True if the response is rate limited
+    def update(self, resource, response):
+        headers = response.headers
+        resource = headers.get('X-RateLimit-Resource', resource)
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        retry_after = headers.get('Retry-After')
+        with self.__lock:
+            if remaining is not None and reset is not None:
+                try:
+                    self.__budgets[resource] = [int(remaining), int(reset)]
+                except ValueError:
+                    pass
+            if retry_after is not None:
+                try:
+                    self.__retry_until = max(self.__retry_until, time.time() + int(retry_after))
+                except ValueError:
+                    pass
+        if response.status_code in (403, 429):
+            return retry_after is not None or remaining == '0'
+        return False
+
+    def get_budget(self, resource):
+        with self.__lock:
+            budget = self.__budgets.get(resource)
+            return list(budget) if budget else None
@@ -10,6 +10,9 @@
 #   params: Query, sort, and other endpoint specific parameters; default = {}
 #   data_key: JSON element containing the results list for the endpoint; default = 'results'
 #   bookmark_query_field: From date-time field used for filtering the query
+#   list_mode: How files are listed, search (search_path) or tree (Git Trees); default = 'search'
+#   repository, tree_path, tree_ref, extension: Repository, folder, branch, and file extension
+#       for list_mode = tree
 
 STREAMS = {
     # Reference: https://github.com/CSSEGISandData/COVID-19/tree/master/csse_covid_19_data/csse_covid_19_daily_reports
@@ -20,6 +23,11 @@ STREAMS = {
         'replication_method': 'INCREMENTAL',
         'replication_keys': ['last_modified'],
         'bookmark_query_field': 'If-Modified-Since',
+        'list_mode': 'search',
+        'repository': 'CSSEGISandData/COVID-19',
+        'tree_path': 'csse_covid_19_data/csse_covid_19_daily_reports',
+        'tree_ref': 'master',
+        'extension': 'csv',
         'children': {
             'jh_csse_daily': {
                 'key_properties': ['date', 'row_number'],
@@ -38,6 +46,11 @@ STREAMS = {
         'replication_method': 'INCREMENTAL',
         'replication_keys': ['last_modified'],
         'bookmark_query_field': 'If-Modified-Since',
+        'list_mode': 'search',
+        'repository': 'pcm-dpc/COVID-19',
+        'tree_path': 'dati-regioni',
+        'tree_ref': 'master',
+        'extension': 'csv',
         'children': {
             'italy_daily_region': {
                 'key_properties': ['date', 'row_number'],
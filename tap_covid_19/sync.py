@@ -1,35 +1,80 @@
 
 import base64
-import io
+import codecs
+import collections
 import csv
+import json
+import mmap
+import multiprocessing
+import threading
+import time
+from concurrent import futures
+from urllib.parse import parse_qs, quote, urlsplit
 import singer
-from singer import metrics, metadata, Transformer, utils
+from singer import metrics, metadata, utils
 from singer.utils import strptime_to_utc
+from tap_covid_19.archive import ArchiveReader, get_blob_sha
+from tap_covid_19.bookmark import Bookmark
+from tap_covid_19.budget import MemoryBudget, PARSED_RECORDS_FACTOR
+from tap_covid_19.cache import BlobCache
+from tap_covid_19.conform import get_conformer
+from tap_covid_19.emitter import MessageWriter, get_encoder, get_writer, set_writer
+from tap_covid_19.fingerprints import RowFingerprints, get_row_fingerprint, get_row_key
+from tap_covid_19.local import LocalRepository
+from tap_covid_19.manifest import decode_manifest, encode_manifest, short_sha
+from tap_covid_19.profiler import Profiler, get_profiler, set_profiler
 from tap_covid_19.streams import STREAMS
-from tap_covid_19.transform import transform_record
+from tap_covid_19.transform import FileInfo, get_file_transformer
 
 LOGGER = singer.get_logger()
 
+# Files per page (batch) for list_mode = tree
+TREE_PAGE_SIZE = 100
+# Archive: files per GraphQL request for their last commits
+GRAPHQL_PAGE_SIZE = 100
+
+# Content chunk size for decoding/streaming file bodies
+CHUNK_SIZE = 65536
+
+# Search/tree item fields for the files stream record, for raw_downloads
+FILE_ITEM_KEYS = ['name', 'path', 'sha', 'size', 'url', 'git_url', 'html_url', 'download_url']
+
+# Raw file URLs (download_url of the contents API): <RAW_BASE_URL>/<repository>/<ref>/<path>
+RAW_BASE_URL = 'https://raw.githubusercontent.com'
+
+# Checkpoint (within a files stream) after each page, and every N files completed if N > 0
+DEFAULT_CHECKPOINT_FILES = 0
+
+# State lock: streams synced in parallel share one state (bookmarks, manifests, currently_syncing);
+#   each change and the STATE message w/ it are made under the lock.
+STATE_LOCK = threading.RLock()
+
 
 def write_schema(catalog, stream_name):
     stream = catalog.get_stream(stream_name)
     schema = stream.schema.to_dict()
     try:
-        singer.write_schema(stream_name, schema, stream.key_properties)
+        get_writer().write_schema(stream_name, schema, stream.key_properties)
     except OSError as err:
         LOGGER.info('OS Error writing schema for: {}'.format(stream_name))
         raise err
 
 
+# Returns the message size (bytes)
 def write_record(stream_name, record, time_extracted):
     try:
-        singer.messages.write_record(stream_name, record, time_extracted=time_extracted)
+        return get_writer().write_record(stream_name, record, time_extracted=time_extracted)
     except OSError as err:
         LOGGER.info('OS Error writing record for: {}'.format(stream_name))
         LOGGER.info('record: {}'.format(record))
         raise err
 
 
+# STATE messages flush the buffered messages (RECORDs before the STATE)
+def write_state(state):
+    get_writer().write_state(state)
+
+
 def get_bookmark(state, stream, default):
     if (state is None) or ('bookmarks' not in state):
         return default
@@ -41,54 +86,701 @@ def get_bookmark(state, stream, default):
 
 
 def write_bookmark(state, stream, value):
-    if 'bookmarks' not in state:
-        state['bookmarks'] = {}
-    state['bookmarks'][stream] = value
-    LOGGER.info('Write state for stream: {}, value: {}'.format(stream, value))
-    singer.write_state(state)
+    with STATE_LOCK:
+        if 'bookmarks' not in state:
+            state['bookmarks'] = {}
+        state['bookmarks'][stream] = value
+        LOGGER.info('Write state for stream: {}, value: {}'.format(stream, value))
+        write_state(state)
+
+
+# Manifests: compact path -> sha map of the files synced for a files stream
+def get_manifest(state, stream):
+    if (state is None) or ('manifests' not in state):
+        return {}
+    return decode_manifest(state.get('manifests', {}).get(stream))
+
+
+def set_manifest(state, stream, manifest):
+    value = encode_manifest(manifest)
+    with STATE_LOCK:
+        if 'manifests' not in state:
+            state['manifests'] = {}
+        state['manifests'][stream] = value
+
+
+# Row fingerprints store id by stream (row_fingerprints): fingerprints of the store are compared
+#   w/ only if they were committed w/ this state
+def get_fingerprints_store(state, stream):
+    if (state is None) or ('row_fingerprints' not in state):
+        return None
+    return state.get('row_fingerprints', {}).get(stream)
+
+
+def set_fingerprints_store(state, stream, store_id):
+    with STATE_LOCK:
+        if 'row_fingerprints' not in state:
+            state['row_fingerprints'] = {}
+        state['row_fingerprints'][stream] = store_id
+
+
+# Checkpoints: progress within a stream, w/ the manifest of the files completed so far in this
+#   sync (skipped on resume, in any listing order) and the running max bookmark (restored on
+#   resume). Only the files completed in this sync are in the checkpoint (state stays small for
+#   incremental syncs); the stream manifest and bookmark are only written when the stream
+#   completes, since the files are not listed in bookmark order (search: sort=indexed).
+def get_checkpoint(state, stream):
+    if (state is None) or ('checkpoints' not in state):
+        return None
+    return state.get('checkpoints', {}).get(stream)
+
+
+# Manifest of the files completed in this sync (path -> sha) of a checkpoint
+def get_checkpoint_manifest(checkpoint):
+    if not checkpoint:
+        return {}
+    return decode_manifest(checkpoint.get('manifest'))
+
+
+def write_checkpoint(state, stream, manifest, checkpoint):
+    value = encode_manifest(manifest)
+    LOGGER.info('Write checkpoint for stream: {}, value: {}, manifest files: {}'.format(
+        stream, checkpoint, len(manifest)))
+    checkpoint = dict(checkpoint, manifest=value)
+    with STATE_LOCK:
+        if 'checkpoints' not in state:
+            state['checkpoints'] = {}
+        state['checkpoints'][stream] = checkpoint
+        write_state(state)
 
 
-def transform_datetime(this_dttm):
-    with Transformer() as transformer:
-        new_dttm = transformer._transform_datetime(this_dttm)
-    return new_dttm
+def clear_checkpoint(state, stream):
+    with STATE_LOCK:
+        state.get('checkpoints', {}).pop(stream, None)
+        if 'checkpoints' in state and not state['checkpoints']:
+            del state['checkpoints']
 
 
-def process_records(catalog, #pylint: disable=too-many-branches
+# bookmark: Bookmark for INCREMENTAL streams; records before the bookmark are not written
+def process_records(catalog,
                     stream_name,
                     records,
                     time_extracted,
-                    bookmark_field=None,
-                    max_bookmark_value=None,
-                    last_datetime=None):
-    stream = catalog.get_stream(stream_name)
-    schema = stream.schema.to_dict()
-    stream_metadata = metadata.to_map(stream.metadata)
+                    bookmark=None,
+                    conformer=None):
+    # Schema-compiled conformer (replaces singer.Transformer), built once per stream
+    if conformer is None:
+        conformer = get_conformer(catalog, stream_name)
+    bookmark_field = bookmark.bookmark_field if bookmark else None
+
+    conform = conformer.conform
+    emit = write_record
+    profiler = get_profiler()
+    if profiler:
+        conform_timer = profiler.timer(stream_name, 'conform')
+        emit_timer = profiler.timer(stream_name, 'emit')
+        conform = conform_timer.wrap(conform)
+        emit = emit_timer.wrap(emit, result_bytes=True)
 
     with metrics.record_counter(stream_name) as counter:
-        for record in records:
-            # Transform record for Singer.io
-            with Transformer() as transformer:
-                transformed_record = transformer.transform(
-                    record, schema, stream_metadata)
+        try:
+            for record in records:
+                # Transform record for Singer.io
+                transformed_record = conform(record)
 
                 # LOGGER.info('transformed_record: {}'.format(transformed_record)) # COMMENT OUT
                 if bookmark_field and (bookmark_field in transformed_record):
-                    last_dttm = transform_datetime(last_datetime)
-                    bookmark_dttm = transform_datetime(transformed_record[bookmark_field])
-                    max_bookmark_dttm = transform_datetime(max_bookmark_value)
-                    # Reset max_bookmark_value to new value if higher
-                    if (max_bookmark_value is None) or (bookmark_dttm > max_bookmark_dttm):
-                        max_bookmark_value = transformed_record[bookmark_field]
-                    # Keep only records whose bookmark is after the last_datetime
-                    if bookmark_dttm >= last_dttm:
-                        write_record(stream_name, transformed_record, time_extracted=time_extracted)
+                    # Update max bookmark; keep only records whose bookmark is after the
+                    #   last_datetime
+                    if bookmark.update(transformed_record[bookmark_field]):
+                        emit(stream_name, transformed_record, time_extracted=time_extracted)
                         counter.increment()
                 else:
-                    write_record(stream_name, transformed_record, time_extracted=time_extracted)
+                    emit(stream_name, transformed_record, time_extracted=time_extracted)
                     counter.increment()
+        finally:
+            if profiler:
+                conform_timer.close()
+                emit_timer.close()
+
+        return counter.value
+
+
+def get_download_url(repository, ref, path):
+    return '{}/{}/{}/{}'.format(RAW_BASE_URL, repository, ref, quote(path))
+
+
+# files stream record fields of a search/tree item (w/o the contents API response):
+#   download_url of search items from the repository and the ref (commit sha) of the item url
+def get_item_file_data(item):
+    file_data = {}
+    for key in FILE_ITEM_KEYS:
+        if key in item:
+            file_data[key] = item[key]
+    if not file_data.get('download_url'):
+        repository = (item.get('repository') or {}).get('full_name')
+        ref = parse_qs(urlsplit(item.get('url') or '').query).get('ref', [None])[0]
+        if repository and ref:
+            file_data['download_url'] = get_download_url(repository, ref, item.get('path'))
+    file_data['type'] = 'file'
+    return file_data
+
+
+# Fetch a single file for a search item
+#   Returns file_data (without _links, content) and the decoded content bytes;
+#   (None, None) if the file is not modified since the bookmark (304).
+#   Checks the blob cache (by git blob sha) before requesting the file contents; file_data of
+#   cached files is built from the item (same as raw_downloads).
+#   raw_downloads: request the raw file body (no JSON/base64 envelope)
+#   stream_content: return the streaming response (raw_downloads, no cache) instead of bytes,
+#       if the file size is known w/o reading the body
+def fetch_file(client, #pylint: disable=too-many-arguments
+               stream_name,
+               item,
+               headers,
+               cache=None,
+               last_dttm=None,
+               raw_downloads=False,
+               stream_content=False):
+    file_sha = item.get('sha')
+    if cache:
+        file_modified, content = cache.get(file_sha)
+        if content is not None:
+            LOGGER.info('File cache hit for Stream {}: {}'.format(stream_name, item.get('path')))
+            # Same as If-Modified-Since: skip files not modified after the bookmark
+            if last_dttm and file_modified and strptime_to_utc(file_modified) <= last_dttm:
+                return None, None
+            # file_data from the item (the cached blob may have been fetched for another path)
+            file_data = get_item_file_data(item)
+            file_data['size'] = len(content)
+            if not raw_downloads:
+                file_data['encoding'] = 'base64'
+            file_data['last_modified'] = file_modified
+            return file_data, content
+
+    file_url = item.get('url')
+    LOGGER.info('File URL for Stream {}: {}'.format(stream_name, file_url))
+    if raw_downloads:
+        # API request raw file body; file_data fields from the search/tree item
+        response, file_modified = client.get_raw(
+            url=file_url,
+            headers=headers,
+            endpoint=stream_name)
+        if response is None:
+            return None, None
+        # size: from the tree item, or the (not compressed) Content-Length; otherwise the
+        #   body is read (not streamed) to get its size
+        size = item.get('size')
+        if size is None and not response.headers.get('Content-Encoding') \
+            and response.headers.get('Content-Length', '').isdigit():
+            size = int(response.headers.get('Content-Length'))
+        if stream_content and not cache and size is not None:
+            content = response
+        else:
+            with response:
+                content = response.content
+            size = len(content)
+        file_data = get_item_file_data(item)
+        file_data['size'] = size
+        file_data['last_modified'] = file_modified
+    else:
+        # API request file_data for item, single-file (ignore file_next_url)
+        file_data, file_next_url = client.get(
+            url=file_url,
+            headers=headers,
+            endpoint=stream_name)
+        if not file_data:
+            return None, None
+
+        content = file_data.pop('content', None)
+        profiler = get_profiler()
+        if profiler and content:
+            with profiler.timer(stream_name, 'decode') as decode_timer:
+                content = base64.b64decode(content)
+            profiler.add(stream_name, 'decode', decode_timer.seconds, 1, len(content))
+        else:
+            content = base64.b64decode(content) if content else b''
+
+        # Remove _links node
+        file_data.pop('_links', None)
+
+    if cache:
+        cache.put(file_data.get('sha'), content, file_data.get('last_modified'))
+    return file_data, content
+
+
+# Read a single file for a local repository item (same file_data as raw_downloads)
+#   Returns (None, None) if the file is not modified since the bookmark (same as 304).
+#   use_mmap: content may be a (read-only) mmap of the working tree file
+def fetch_local_file(local_repository, stream_name, item, endpoint_config,
+                     last_dttm=None, use_mmap=False):
+    tree_path = endpoint_config.get('tree_path').strip('/')
+    file_path = item.get('path')
+    file_modified = local_repository.get_last_modified(tree_path, file_path)
+    if last_dttm and file_modified and strptime_to_utc(file_modified) <= last_dttm:
+        return None, None
+
+    LOGGER.info('Local file for Stream {}: {}'.format(stream_name, file_path))
+    content = local_repository.read_file(tree_path, file_path, item.get('sha'), use_mmap=use_mmap)
+    file_data = get_item_file_data(item)
+    file_data['size'] = len(content)
+    file_data['last_modified'] = file_modified
+    return file_data, content
+
+
+# Last commit date-time of each file (tree item) at the ref, by path: one GraphQL request for
+#   up to GRAPHQL_PAGE_SIZE files (the first commit of each path's history, aliased), instead of
+#   a request per file. Same as the Last-Modified of the file contents (committer date).
+# Reference: https://developer.github.com/v4/object/commit/#history
+def get_files_last_modified(client, stream_name, repository, ref, items):
+    owner, name = repository.split('/', 1)
+    files_last_modified = {}
+    for items_chunk in utils.chunk(items, GRAPHQL_PAGE_SIZE):
+        params = ['$owner: String!', '$name: String!', '$ref: String!']
+        variables = {'owner': owner, 'name': name, 'ref': ref}
+        fields = []
+        for index, item in enumerate(items_chunk):
+            params.append('$p{}: String!'.format(index))
+            variables['p{}'.format(index)] = item.get('path')
+            fields.append('f{0}: history(first: 1, path: $p{0}) {{ nodes {{ committedDate }} }}'
+                          .format(index))
+        query = 'query({}) {{ repository(owner: $owner, name: $name) {{ ' \
+            'object(expression: $ref) {{ ... on Commit {{ {} }} }} }} }}'.format(
+                ', '.join(params), ' '.join(fields))
+        data = client.graphql(query, variables, endpoint=stream_name)
+        commit = (data.get('repository') or {}).get('object') or {}
+        for index, item in enumerate(items_chunk):
+            nodes = (commit.get('f{}'.format(index)) or {}).get('nodes') or []
+            committed_date = nodes[0].get('committedDate') if nodes else None
+            if committed_date:
+                committed_date = strptime_to_utc(committed_date).strftime('%Y-%m-%dT%H:%M:%SZ')
+            files_last_modified[item.get('path')] = committed_date
+    return files_last_modified
+
+
+# Read a single file for a tree item from the repository archive (same file_data as raw_downloads)
+#   file_modified: from get_files_last_modified (archive entries all have the commit date-time
+#   of the ref, not the last change of each file)
+#   sha: git blob sha of the archive content. Files not in the archive (e.g. changed between
+#   the tree and archive requests) are requested w/ the API.
+def fetch_archive_file(archive_reader, #pylint: disable=too-many-arguments
+                       client,
+                       stream_name,
+                       item,
+                       headers,
+                       file_modified=None,
+                       last_dttm=None):
+    # Same as If-Modified-Since: skip files not modified after the bookmark (not read; the
+    #   archive entry is skipped by the next read)
+    if last_dttm and file_modified and strptime_to_utc(file_modified) <= last_dttm:
+        return None, None
+    content = archive_reader.read(item.get('path'))
+    if content is None:
+        LOGGER.warning('File not in archive for Stream {}: {}'.format(
+            stream_name, item.get('path')))
+        return fetch_file(client, stream_name, item, headers, last_dttm=last_dttm)
+
+    file_data = get_item_file_data(item)
+    file_data['sha'] = get_blob_sha(content)
+    file_data['size'] = len(content)
+    file_data['last_modified'] = file_modified
+    return file_data, content
+
+
+# Content bytes, in chunks, from bytes, an mmap, or a streaming response (closed when done)
+def iter_content_chunks(content):
+    if isinstance(content, bytes):
+        for index in range(0, len(content), CHUNK_SIZE):
+            yield content[index:index + CHUNK_SIZE]
+        return
+    if isinstance(content, mmap.mmap):
+        with content:
+            for index in range(0, len(content), CHUNK_SIZE):
+                yield content[index:index + CHUNK_SIZE]
+        return
+    with content:
+        for chunk in content.iter_content(chunk_size=CHUNK_SIZE):
+            yield chunk
+
+
+# Incrementally decode UTF-8 content and split lines on newline (same as a text file)
+def iter_content_lines(content):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    pending = ''
+    for chunk in iter_content_chunks(content):
+        lines = (pending + decoder.decode(chunk)).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    pending = pending + decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+# Parse and transform the csv records of a file for a child stream (generator)
+#   Rows are parsed as compact lists of values (csv.reader) w/ one FileInfo (git_* fields) for
+#   the file; the transformed record is the first dict built for each row.
+#   columnar: transform all records of the file at once (column-wise), then yield them
+def iter_csv_records(child_stream_name, file_data, content, columnar=False):
+    file_info = FileInfo(
+        file_data.get('path'),
+        file_data.get('sha'),
+        file_data.get('last_modified'),
+        file_data.get('name'))
+
+    reader = csv.reader(iter_content_lines(content))
+    # Header row (same as csv.DictReader fieldnames)
+    header = next(reader, None)
+    # Prepared transformer for the file (from file name and header row)
+    transformer = get_file_transformer(child_stream_name, file_info.name, header)
+    rows = reader
+    transform = transformer.transform_row
+    profiler = get_profiler()
+    if profiler:
+        parse_timer = profiler.timer(child_stream_name, 'parse')
+        transform_timer = profiler.timer(child_stream_name, 'transform')
+        if isinstance(content, (bytes, mmap.mmap)):
+            parse_timer.bytes = len(content)
+        rows = parse_timer.iterate(reader)
+        transform = transform_timer.wrap(transform)
+
+    try:
+        if columnar:
+            # Blank lines are skipped (same as csv.DictReader)
+            csv_rows = [row for row in rows if row]
+            if profiler:
+                with transform_timer:
+                    transformed_csv_records = transformer.transform_row_columns(
+                        csv_rows, file_info)
+                transform_timer.count = len(csv_rows)
+            else:
+                transformed_csv_records = transformer.transform_row_columns(csv_rows, file_info)
+            for transformed_csv_record in transformed_csv_records:
+                # Skip bad records (the file transformers skip all or none of a file's records)
+                if transformed_csv_record is not None:
+                    yield transformed_csv_record
+            return
+
+        i = 1
+        for row in rows:
+            # Blank lines are skipped (same as csv.DictReader)
+            if not row:
+                continue
+
+            # Transform record
+            transformed_csv_record = transform(row, i, file_info)
+
+            # JSCOTT added: skip bad records
+            # Skip bad records
+            if transformed_csv_record is None:
+                continue
+
+            yield transformed_csv_record
+
+            i = i + 1
+    finally:
+        if profiler:
+            parse_timer.close()
+            transform_timer.close()
+
+
+# Row-level changes: yield only the records inserted or modified since the file was last synced,
+#   by row key (key_properties); new_fingerprints gets the fingerprints of all records
+def iter_changed_records(records, key_properties, old_fingerprints, new_fingerprints):
+    for record in records:
+        key = get_row_key(record, key_properties)
+        fingerprint = get_row_fingerprint(record)
+        new_fingerprints[key] = fingerprint
+        if old_fingerprints.get(key) != fingerprint:
+            yield record
+
+
+# Delete markers (_sdc_deleted_at) for the rows (keys) no longer in the file
+def get_deleted_records(file_data, key_properties, old_fingerprints, new_fingerprints,
+                        deleted_at):
+    deleted_records = []
+    for key in old_fingerprints:
+        if key in new_fingerprints:
+            continue
+        record = dict(zip(key_properties, json.loads(key)))
+        record['git_path'] = file_data.get('path')
+        record['git_sha'] = file_data.get('sha')
+        record['git_last_modified'] = file_data.get('last_modified')
+        record['git_file_name'] = file_data.get('name')
+        record['_sdc_deleted_at'] = deleted_at
+        deleted_records.append(record)
+    return deleted_records
+
+
+# Start method of the process pool workers: not fork, since they are started (on the first
+#   submit) while the fetch and stream threads are running; a forked child could inherit a lock
+#   held by another thread. forkserver (spawn where not available) starts workers from a
+#   single-threaded server process.
+def get_process_start_method():
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return 'forkserver'
+    return 'spawn'
+
+
+# Parse and transform the csv records of a file (content bytes), in a process pool worker
+def parse_csv_records(child_stream_name, file_data, content, columnar=False):
+    return list(iter_csv_records(child_stream_name, file_data, content, columnar=columnar))
+
+
+# Submit the csv parsing/transform of a fetched file to the process pool (ahead of emission)
+#   Returns {child_stream_name: future} ({} if the file is not modified)
+def submit_parse_file(process_pool, file_data, content, child_streams, columnar=False):
+    parsed = {}
+    if file_data:
+        for child_stream_name in child_streams:
+            parsed[child_stream_name] = process_pool.submit(
+                parse_csv_records, child_stream_name, file_data, content, columnar)
+    return parsed
+
+
+# Submit the csv parsing/transform of each fetched file to the process pool
+#   Returns [(file_data, {child_stream_name: future})] in file order
+def submit_parse_files(process_pool, file_results, child_streams, columnar=False):
+    parsed_files = []
+    for file_data, content in file_results:
+        parsed_files.append((file_data, submit_parse_file(
+            process_pool, file_data, content, child_streams, columnar=columnar)))
+    return parsed_files
+
+
+# Fetch the files of a page (and w/ a process pool, parse their csv records) ahead of emission,
+#   within the memory budget. Yields (file_data, content) in item order, the same as
+#   submit_parse_files (process_pool) or fetch. Files are fetched ahead (executor, process_pool)
+#   while their estimated sizes fit in the budget; a file's reservation is released when the next
+#   file is requested (after the file is processed).
+def iter_budget_files(memory_budget, #pylint: disable=too-many-arguments
+                      stream_name,
+                      fetch,
+                      fetch_items,
+                      executor=None,
+                      process_pool=None,
+                      child_streams=None,
+                      columnar=False):
+    read_ahead = (executor is not None) or (process_pool is not None)
+    records_factor = (1 + PARSED_RECORDS_FACTOR) if process_pool else 1
+
+    # reservation: [bytes reserved], adjusted to the actual size when the file is fetched
+    def fetch_reserved(item, reservation):
+        file_data, content = fetch(item)
+        if isinstance(content, (bytes, mmap.mmap)):
+            memory_budget.add_file_size(stream_name, len(content))
+            size = len(content) * records_factor
+            memory_budget.adjust(size - reservation[0])
+            reservation[0] = size
+        if process_pool:
+            content = submit_parse_file(
+                process_pool, file_data, content, child_streams, columnar=columnar)
+        return file_data, content
+
+    # [(future or result, reservation)] in item order
+    pending = collections.deque()
+    reservation = None
+    items = iter(fetch_items)
+    item = next(items, None)
+    try:
+        while item is not None or pending:
+            # Submit files while they fit in the budget (wait if none are pending)
+            while item is not None and (read_ahead or not pending):
+                size = memory_budget.estimate_file_size(stream_name, item) * records_factor
+                if not memory_budget.acquire(size, wait=not pending):
+                    break
+                item_reservation = [size]
+                if executor:
+                    pending.append((executor.submit(fetch_reserved, item, item_reservation),
+                                    item_reservation))
+                else:
+                    pending.append((fetch_reserved(item, item_reservation), item_reservation))
+                item = next(items, None)
+
+            result, reservation = pending.popleft()
+            if executor:
+                result = result.result()
+            yield result
+            memory_budget.release(reservation[0])
+            reservation = None
+    finally:
+        # Not completed (error): release the reservations of the files not processed
+        if reservation:
+            memory_budget.release(reservation[0])
+        for result, item_reservation in pending:
+            if executor and not result.cancel():
+                result.add_done_callback(
+                    lambda future, size=item_reservation: memory_budget.release(size[0]))
+            else:
+                memory_budget.release(item_reservation[0])
+
+
+# List the files of a stream, yielding pages (lists) of file items.
+#   search: GitHub code search (search_path), paginated with the Link header
+#   tree: single recursive Git Trees request for tree_path at the branch head, filtered by
+#       extension; w/ search if the tree listing is truncated
+#   archive: same as tree (files are read from the repository archive)
+#   local: local git checkout (local_repository), filtered the same as tree
+def list_files(client, stream_name, search_path, endpoint_config, list_mode='search',
+               local_repository=None):
+    if list_mode == 'local':
+        for items in list_local_files(client, stream_name, endpoint_config, local_repository):
+            yield items
+        return
+    if list_mode in ('tree', 'archive'):
+        tree_items = list_tree_files(client, stream_name, endpoint_config)
+        if tree_items is not None:
+            # Batch into pages, same as search pagination
+            for items_page in utils.chunk(tree_items, TREE_PAGE_SIZE):
+                yield items_page
+            return
+        # Truncated tree listing: list the files w/ search
+        LOGGER.warning('Stream: {}, tree listing is truncated, listing files with search'.format(
+            stream_name))
+
+    data_key = endpoint_config.get('data_key', stream_name)
+    LOGGER.info('data_key = {}'.format(data_key))
+    next_url = '{}/{}'.format(client.base_url, search_path)
+    while next_url is not None:
+        LOGGER.info('Search URL for Stream {}: {}'.format(stream_name, next_url))
+
+        # API request search_data
+        search_data = {}
+        search_data, next_url = client.get(
+            url=next_url,
+            endpoint=stream_name)
+        LOGGER.info('next_url = {}'.format(next_url))
+        # LOGGER.info('search_data = {}'.format(search_data)) # COMMENT OUT
+        yield search_data.get(data_key, [])
+
+
+# Git Trees: https://developer.github.com/v3/git/trees/#get-a-tree-recursively
+#   Recursive listing of the stream's folder only (tree-ish <ref>:<tree_path>); entry paths are
+#   relative to the folder. Returns the file items, or None if the listing is truncated (too many
+#   entries for one response).
+def list_tree_files(client, stream_name, endpoint_config):
+    repository = endpoint_config.get('repository')
+    tree_ref = endpoint_config.get('tree_ref', 'master')
+    tree_path = endpoint_config.get('tree_path').strip('/')
+
+    tree_url = '{}/repos/{}/git/trees/{}?recursive=1'.format(
+        client.base_url, repository, quote('{}:{}'.format(tree_ref, tree_path), safe='/:'))
+    LOGGER.info('Tree URL for Stream {}: {}'.format(stream_name, tree_url))
+    tree_data, tree_next_url = client.get(
+        url=tree_url,
+        endpoint=stream_name)
+    if tree_data.get('truncated'):
+        return None
+
+    entries = []
+    for entry in tree_data.get('tree', []):
+        entry = dict(entry)
+        entry['path'] = '{}/{}'.format(tree_path, entry.get('path'))
+        entries.append(entry)
+    items = get_tree_items(client.base_url, endpoint_config, entries)
+    LOGGER.info('Stream: {}, tree files: {}'.format(stream_name, len(items)))
+    return items
+
+
+# Search items (same fields) for the blob entries of a tree under tree_path w/ the extension
+def get_tree_items(base_url, endpoint_config, entries):
+    repository = endpoint_config.get('repository')
+    tree_path = endpoint_config.get('tree_path').strip('/')
+    tree_ref = endpoint_config.get('tree_ref', 'master')
+    extension = '.{}'.format(endpoint_config.get('extension', 'csv')).lower()
+
+    items = []
+    for entry in entries:
+        path = entry.get('path')
+        if entry.get('type') != 'blob' or not path.startswith(tree_path + '/') \
+            or not path.lower().endswith(extension):
+            continue
+        quoted_path = quote(path)
+        items.append({
+            'name': path.split('/')[-1],
+            'path': path,
+            'sha': entry.get('sha'),
+            'size': entry.get('size'),
+            'url': '{}/repos/{}/contents/{}?ref={}'.format(
+                base_url, repository, quoted_path, tree_ref),
+            'git_url': entry.get('url'),
+            'html_url': 'https://github.com/{}/blob/{}/{}'.format(
+                repository, tree_ref, quoted_path),
+            'download_url': get_download_url(repository, tree_ref, path)
+        })
+    return items
+
+
+# Local git checkout: files under tree_path at HEAD of the local repository
+def list_local_files(client, stream_name, endpoint_config, local_repository):
+    tree_path = endpoint_config.get('tree_path').strip('/')
+    LOGGER.info('Local repository for Stream {}: {}'.format(
+        stream_name, local_repository.repo_path))
+    items = get_tree_items(client.base_url, endpoint_config, local_repository.list_tree(tree_path))
+    LOGGER.info('Stream: {}, local files: {}'.format(stream_name, len(items)))
+
+    # Batch into pages, same as search pagination
+    for items_page in utils.chunk(items, TREE_PAGE_SIZE):
+        yield items_page
 
-        return max_bookmark_value, counter.value
+
+# Row-level changes of a file for a child stream, after its changed records are written:
+#   writes the delete markers (delete_markers) and stores the new row fingerprints (pending).
+#   Returns the delete markers count.
+def sync_row_changes(catalog, #pylint: disable=too-many-arguments
+                     child_stream_name,
+                     file_data,
+                     time_extracted,
+                     conformer,
+                     row_fingerprints,
+                     key_properties,
+                     old_fingerprints,
+                     new_fingerprints,
+                     delete_markers,
+                     changed_count):
+    file_path = file_data.get('path')
+    if not new_fingerprints and old_fingerprints:
+        # No rows parsed (e.g. a file skipped by the transformer); keep the last fingerprints
+        LOGGER.warning('Stream: {}, no rows for {}, row fingerprints not updated'.format(
+            child_stream_name, file_path))
+        return 0
+
+    deleted_count = 0
+    if delete_markers:
+        deleted_records = get_deleted_records(
+            file_data, key_properties, old_fingerprints, new_fingerprints,
+            utils.strftime(time_extracted))
+        deleted_count = process_records(
+            catalog=catalog,
+            stream_name=child_stream_name,
+            records=deleted_records,
+            time_extracted=time_extracted,
+            conformer=conformer)
+    LOGGER.info('Stream: {}, file: {}, rows: {}, changed: {}, deleted: {}'.format(
+        child_stream_name, file_path, len(new_fingerprints), changed_count, deleted_count))
+    row_fingerprints.put(child_stream_name, file_path, new_fingerprints)
+    return deleted_count
+
+
+# Checkpoint after the files (up to last_item) are completed; pending row fingerprints of the
+#   completed files are committed w/ it. synced: manifest of the files completed in this sync
+def sync_checkpoint(state, #pylint: disable=too-many-arguments
+                    stream_name,
+                    synced,
+                    bookmark,
+                    last_item,
+                    files_completed,
+                    row_fingerprints=None,
+                    child_streams=None):
+    write_checkpoint(state, stream_name, synced, {
+        'path': last_item.get('path'),
+        'sha': short_sha(last_item.get('sha')),
+        'max_last_modified': bookmark.value,
+        'files': files_completed
+    })
+    if row_fingerprints:
+        for child_stream_name in child_streams or []:
+            row_fingerprints.commit(child_stream_name)
 
 
 # Sync a specific endpoint.
@@ -100,16 +792,62 @@ def sync_endpoint(client, #pylint: disable=too-many-branches
                   search_path,
                   endpoint_config,
                   bookmark_field=None,
-                  selected_streams=None):
+                  selected_streams=None,
+                  max_concurrent_fetches=1,
+                  cache=None,
+                  list_mode='search',
+                  raw_downloads=False,
+                  columnar_transform=False,
+                  strict_conform=True,
+                  process_pool=None,
+                  local_repository=None,
+                  row_fingerprints=None,
+                  delete_markers=False,
+                  checkpoint_files=0,
+                  memory_budget=None):
 
     # Endpoint parameters
     bookmark_query_field = endpoint_config.get('bookmark_query_field', None)
-    data_key = endpoint_config.get('data_key', stream_name)
-    LOGGER.info('data_key = {}'.format(data_key))
+    if local_repository:
+        list_mode = 'local'
+    LOGGER.info('Stream: {}, list_mode = {}'.format(stream_name, list_mode))
 
     # Get the latest bookmark for the stream and set the last_datetime
     last_datetime = get_bookmark(state, stream_name, start_date)
-    file_max_bookmark_value = last_datetime
+    bookmark = None
+    if bookmark_field:
+        bookmark = Bookmark(bookmark_field, last_datetime)
+
+    # Get the manifest (path -> sha) of files already synced; skip unchanged files
+    #   synced: manifest of the files completed in this sync (checkpoints)
+    manifest = {}
+    synced = {}
+    if bookmark_field:
+        manifest = get_manifest(state, stream_name)
+        LOGGER.info('Stream: {}, manifest files: {}'.format(stream_name, len(manifest)))
+
+    # Row fingerprints: compared w/ the committed fingerprints only if the state has the stream's
+    #   manifest and the same store id (otherwise, e.g. after a state reset, all rows are written
+    #   and the fingerprints are replaced)
+    compare_fingerprints = False
+    if row_fingerprints:
+        compare_fingerprints = bool(manifest) and \
+            get_fingerprints_store(state, stream_name) == row_fingerprints.store_id
+        if not compare_fingerprints:
+            LOGGER.info('Stream: {}, row fingerprints not in the state, writing all rows'.format(
+                stream_name))
+
+    if bookmark_field:
+        # Resume from a checkpoint: skip the completed files and restore the running max
+        #   bookmark of the completed files
+        checkpoint = get_checkpoint(state, stream_name)
+        if checkpoint:
+            synced = get_checkpoint_manifest(checkpoint)
+            manifest.update(synced)
+            LOGGER.info('Stream: {}, resume from checkpoint: {}, completed files: {}'.format(
+                stream_name, dict((key, value) for key, value in checkpoint.items()
+                                  if key != 'manifest'), len(synced)))
+            bookmark.update(checkpoint.get('max_last_modified'))
 
     # Convert to GitHub date format, example: Sun, 13 Oct 2019 22:40:01 GMT
     last_dttm = strptime_to_utc(last_datetime)
@@ -129,127 +867,224 @@ def sync_endpoint(client, #pylint: disable=too-many-branches
                 LOGGER.info('Stream: {}, selected_fields: {}'.format(
                     child_stream_name, child_selected_fields))
 
-    # pagination: loop thru all pages of data using next_url (if not None)
+    # pagination: loop thru all pages of listed files
     page = 1
     offset = 0
+    # Files completed, since the last checkpoint, and the last file completed
+    files_completed = 0
+    checkpoint_count = 0
+    last_item = None
     file_total_records = 0
     csv_total_records = 0
-    next_url = '{}/{}'.format(client.base_url, search_path)
 
-    i = 1
-    while next_url is not None:
-        LOGGER.info('Search URL for Stream {}: {}'.format(stream_name, next_url))
+    # Child streams selected for the csv records of each file
+    child_streams = []
+    if children:
+        for child_stream_name in children:
+            if child_stream_name in selected_streams:
+                child_streams.append(child_stream_name)
 
-        # API request search_data
-        search_data = {}
-        search_data, next_url = client.get(
-            url=next_url,
-            endpoint=stream_name)
-        LOGGER.info('next_url = {}'.format(next_url))
-        # LOGGER.info('search_data = {}'.format(search_data)) # COMMENT OUT
+    # Row-level change detection (row_fingerprints): key_properties of each child stream
+    child_key_properties = {}
+    for child_stream_name in child_streams:
+        child_key_properties[child_stream_name] = children[child_stream_name].get(
+            'key_properties', ['row_number'])
+
+    # Schema-compiled record conformers for the file stream and child streams
+    conformers = {}
+    for conform_stream_name in [stream_name] + child_streams:
+        conformers[conform_stream_name] = get_conformer(
+            catalog, conform_stream_name, strict=strict_conform)
 
+    # Worker pool for fetching the files of each search page concurrently;
+    #   executor.map returns results in the same order as the search items.
+    # Sequential (max_concurrent_fetches = 1): each file is fetched when it is processed,
+    #   and raw file bodies are streamed (if not cached) straight into the csv reader
+    #   of the (single) child stream.
+    # Archive: files are read in order from one streaming archive request (not concurrently);
+    #   their last commit date-times are looked up w/ one GraphQL request for each page
+    archive_reader = None
+    if list_mode == 'archive':
+        archive_reader = ArchiveReader(lambda: client.get_archive(
+            endpoint_config.get('repository'),
+            endpoint_config.get('tree_ref', 'master'),
+            endpoint=stream_name))
+    executor = None
+    if max_concurrent_fetches > 1 and archive_reader is None:
+        executor = futures.ThreadPoolExecutor(max_workers=max_concurrent_fetches)
+    stream_content = raw_downloads and (cache is None) and (executor is None) \
+        and (archive_reader is None) \
+        and (process_pool is None) and len(child_streams) == 1
+    # Local files are memory-mapped if read once, in-process (not sent to a worker process)
+    use_mmap = (process_pool is None) and len(child_streams) == 1
+
+    file_pages = list_files(client, stream_name, search_path, endpoint_config, list_mode,
+                            local_repository=local_repository)
+    profiler = get_profiler()
+    if profiler:
+        list_timer = profiler.timer(stream_name, 'list')
+        file_pages = list_timer.iterate(file_pages, count_items=True)
+
+    for search_items in file_pages:
         # time_extracted: datetime when the data was extracted from the API
         time_extracted = utils.now()
-        search_items = search_data.get(data_key, [])
         if not search_items:
             LOGGER.info('Stream: {}, no files found'.format(stream_name))
             break # No data results
 
-        file_count = 0
-        file_records = []
-        csv_records = []
+        headers = {}
+        if bookmark_query_field:
+            headers[bookmark_query_field] = last_modified
+
+        # Skip files whose sha matches the manifest (unchanged since they were synced)
+        fetch_items = []
         for item in search_items:
+            if manifest.get(item.get('path')) != short_sha(item.get('sha')):
+                fetch_items.append(item)
+        skipped_count = len(search_items) - len(fetch_items)
+        if skipped_count:
+            LOGGER.info('Stream: {}, skipped {} unchanged files'.format(stream_name, skipped_count))
+
+        # Archive: last commit date-time of the files to read, by path
+        archive_modified = {}
+        if archive_reader and fetch_items:
+            archive_modified = get_files_last_modified(
+                client, stream_name, endpoint_config.get('repository'),
+                endpoint_config.get('tree_ref', 'master'), fetch_items)
+
+        def fetch(item):
+            if local_repository:
+                return fetch_local_file(local_repository, stream_name, item, endpoint_config,
+                                        last_dttm=last_dttm if bookmark_query_field else None,
+                                        use_mmap=use_mmap)
+            if archive_reader:
+                return fetch_archive_file(archive_reader, client, stream_name, item, dict(headers),
+                                          file_modified=archive_modified.get(item.get('path')),
+                                          last_dttm=last_dttm if bookmark_query_field else None)
+            return fetch_file(client, stream_name, item, dict(headers),
+                              cache=cache,
+                              last_dttm=last_dttm if bookmark_query_field else None,
+                              raw_downloads=raw_downloads,
+                              stream_content=stream_content)
+
+        if profiler:
+            untimed_fetch = fetch
+
+            # Called from the fetch threads: added to the profiler for each file
+            def timed_fetch(item):
+                start = time.perf_counter()
+                file_data, content = untimed_fetch(item)
+                profiler.add(stream_name, 'fetch', time.perf_counter() - start, 1,
+                             len(content) if isinstance(content, (bytes, mmap.mmap)) else 0)
+                return file_data, content
+
+            fetch = timed_fetch
+
+        if memory_budget:
+            # Files fetched (and parsed) ahead within the memory budget
+            file_results = iter_budget_files(
+                memory_budget, stream_name, fetch, fetch_items,
+                executor=executor,
+                process_pool=process_pool,
+                child_streams=child_streams,
+                columnar=columnar_transform)
+        elif executor:
+            file_results = executor.map(fetch, fetch_items)
+        else:
+            file_results = map(fetch, fetch_items)
+
+        # Process pool: csv records of the page's files are parsed/transformed in parallel,
+        #   then emitted below in file (and row_number) order
+        if process_pool and not memory_budget:
+            file_results = submit_parse_files(
+                process_pool, file_results, child_streams, columnar=columnar_transform)
+
+        file_count = skipped_count
+        file_record_count = 0
+        csv_record_count = 0
+        for item, (file_data, content) in zip(fetch_items, file_results):
             file_count = file_count + 1
-            file_url = item.get('url')
-            LOGGER.info('File URL for Stream {}: {}'.format(stream_name, file_url))
-            file_data = {}
-            headers = {}
-            if bookmark_query_field:
-                headers[bookmark_query_field] = last_modified
-            # API request file_data for item, single-file (ignore file_next_url)
-            file_data, file_next_url = client.get(
-                url=file_url,
-                headers=headers,
-                endpoint=stream_name)
             # LOGGER.info('file_data: {}'.format(file_data)) # TESTING ONLY - COMMENT OUT
+            if bookmark_field:
+                manifest[item.get('path')] = (file_data or item).get('sha')
+                synced[item.get('path')] = manifest[item.get('path')]
 
+            # file_data: None if not modified since the bookmark
             if file_data:
-                content = file_data.get('content')
-                content_list = []
-                if content:
-                    content_b64 = base64.b64decode(content)
-                    content_str = content_b64.decode('utf-8')
-                    file_like_object = io.StringIO(content_str)
-                    
-                    with file_like_object as f:
-                        reader = csv.DictReader(f)
-                        content_list = [r for r in reader]
-
-                file_modified = file_data.get('last_modified')
-                file_sha = file_data.get('sha')
-                file_path = file_data.get('path')
-                file_name = file_data.get('name')
-
-                # Remove _links, content nodes
-                file_data.pop('_links', None)
-                file_data.pop('content', None)
-
-                # LOGGER.info('file_data: {}'.format(file_data)) # TESTING ONLY - COMMENT OUT
-                file_records.append(file_data)
-
-                # Loop thru each child object and append csv records
-                if children:
-                    for child_stream_name, child_endpoint_config in children.items():
-                        if child_stream_name in selected_streams:
-                            i = 1
-                            for record in content_list:
-                                record['git_path'] = file_path
-                                record['git_sha'] = file_sha
-                                record['git_last_modified'] = file_modified
-                                record['git_file_name'] = file_name
-                                record['row_number'] = i
-
-                                # Transform record and append
-                                transformed_csv_record = {}
-                                transformed_csv_record = transform_record(child_stream_name, record)
-
-                                # JSCOTT added: skip bad records
-                                # Skip bad records
-                                if transformed_csv_record is None:
-                                    continue
-
-                                csv_records.append(transformed_csv_record)
-
-                                i = i + 1
-
-        # Process file_records and get the max_bookmark_value and record_count
-        file_max_bookmark_value, file_record_count = process_records(
-            catalog=catalog,
-            stream_name=stream_name,
-            records=file_records,
-            time_extracted=time_extracted,
-            bookmark_field=bookmark_field,
-            max_bookmark_value=file_max_bookmark_value,
-            last_datetime=last_datetime)
-        LOGGER.info('Stream {}, batch processed {} records'.format(
-            stream_name, file_record_count))
-        file_total_records = file_total_records + file_record_count
+                # Process file record (updates the bookmark) and get the record_count
+                record_count = process_records(
+                    catalog=catalog,
+                    stream_name=stream_name,
+                    records=[file_data],
+                    time_extracted=time_extracted,
+                    bookmark=bookmark,
+                    conformer=conformers[stream_name])
+                file_record_count = file_record_count + record_count
 
-        # Loop thru each child object to process csv records
-        if children:
-            for child_stream_name, child_endpoint_config in children.items():
-                if child_stream_name in selected_streams:
-                    csv_max_bookmark_value, csv_record_count = process_records(
+                # Loop thru each child object and stream the csv records of the file
+                for child_stream_name in child_streams:
+                    if process_pool and profiler:
+                        # Parsed in a worker process: time waiting for the result
+                        with profiler.timer(child_stream_name, 'parse') as parse_timer:
+                            csv_records = content[child_stream_name].result()
+                        profiler.add(child_stream_name, 'parse', parse_timer.seconds,
+                                     len(csv_records))
+                    elif process_pool:
+                        # content: parsed csv records (futures) by child stream
+                        csv_records = content[child_stream_name].result()
+                    else:
+                        csv_records = iter_csv_records(child_stream_name, file_data, content,
+                                                       columnar=columnar_transform)
+                    if row_fingerprints:
+                        old_fingerprints = {}
+                        if compare_fingerprints:
+                            old_fingerprints = row_fingerprints.get(
+                                child_stream_name, file_data.get('path'))
+                        new_fingerprints = {}
+                        csv_records = iter_changed_records(
+                            csv_records, child_key_properties[child_stream_name],
+                            old_fingerprints, new_fingerprints)
+                    record_count = process_records(
                         catalog=catalog,
                         stream_name=child_stream_name,
                         records=csv_records,
                         time_extracted=time_extracted,
-                        bookmark_field=None,
-                        max_bookmark_value=None,
-                        last_datetime=last_datetime)
-                    LOGGER.info('Stream {}, batch processed {} records'.format(
-                        child_stream_name, csv_record_count))
-                    csv_total_records = csv_total_records + csv_record_count
+                        conformer=conformers[child_stream_name])
+                    csv_record_count = csv_record_count + record_count
+                    if row_fingerprints:
+                        csv_record_count = csv_record_count + sync_row_changes(
+                            catalog, child_stream_name, file_data, time_extracted,
+                            conformers[child_stream_name], row_fingerprints,
+                            child_key_properties[child_stream_name], old_fingerprints,
+                            new_fingerprints, delete_markers, record_count)
+
+            # Checkpoint every checkpoint_files files completed (within a page)
+            files_completed = files_completed + 1
+            checkpoint_count = checkpoint_count + 1
+            last_item = item
+            if bookmark_field and checkpoint_files and checkpoint_count >= checkpoint_files:
+                sync_checkpoint(state, stream_name, synced, bookmark, last_item,
+                                files_completed, row_fingerprints, child_streams)
+                checkpoint_count = 0
+
+        if memory_budget:
+            # Release the reservation of the last file (zip stops w/o resuming file_results)
+            file_results.close()
+        LOGGER.info('Stream {}, batch processed {} records'.format(
+            stream_name, file_record_count))
+        file_total_records = file_total_records + file_record_count
+        for child_stream_name in child_streams:
+            LOGGER.info('Stream {}, batch processed {} records'.format(
+                child_stream_name, csv_record_count))
+        csv_total_records = csv_total_records + csv_record_count
+        if memory_budget:
+            memory_budget.log_metrics(stream_name)
+
+        # Checkpoint for each page
+        if bookmark_field and checkpoint_count:
+            sync_checkpoint(state, stream_name, synced, bookmark, last_item,
+                            files_completed, row_fingerprints, child_streams)
+            checkpoint_count = 0
 
         # to_rec: to record; ending record for the batch page
         to_rec = offset + file_count
@@ -261,11 +1096,26 @@ def sync_endpoint(client, #pylint: disable=too-many-branches
         # Pagination: increment the offset by the limit (batch-size) and page
         offset = offset + file_count
         page = page + 1
-        i = i + 1
 
-    # Update the state with the max_bookmark_value for the stream
+    if executor:
+        executor.shutdown(wait=True)
+    if profiler:
+        list_timer.close()
+    if archive_reader:
+        LOGGER.info('Stream: {}, archive files: {}'.format(stream_name, archive_reader.files))
+        archive_reader.close()
+
+    # Update the state with the manifest and the max bookmark value for the stream
     if bookmark_field:
-        write_bookmark(state, stream_name, file_max_bookmark_value)
+        set_manifest(state, stream_name, manifest)
+        if row_fingerprints:
+            set_fingerprints_store(state, stream_name, row_fingerprints.store_id)
+        clear_checkpoint(state, stream_name)
+        write_bookmark(state, stream_name, bookmark.value)
+    # Row fingerprints of the files synced are committed w/ the state
+    if row_fingerprints:
+        for child_stream_name in child_streams:
+            row_fingerprints.commit(child_stream_name)
 
     # Return total_records across all pages
     LOGGER.info('Synced Stream: {}, TOTAL pages: {}, file records: {}, csv records: {}'.format(
@@ -281,11 +1131,28 @@ def sync_endpoint(client, #pylint: disable=too-many-branches
 #  the starting point to continue from.
 # Reference: https://github.com/singer-io/singer-python/blob/master/singer/bookmarks.py#L41-L46
 def update_currently_syncing(state, stream_name):
-    if (stream_name is None) and ('currently_syncing' in state):
-        del state['currently_syncing']
-    else:
-        singer.set_currently_syncing(state, stream_name)
-    singer.write_state(state)
+    with STATE_LOCK:
+        if (stream_name is None) and ('currently_syncing' in state):
+            del state['currently_syncing']
+        else:
+            singer.set_currently_syncing(state, stream_name)
+        write_state(state)
+
+
+# Streams synced in parallel: syncing = streams in progress, in STREAMS order.
+#   currently_syncing is the first stream in progress; an interrupted sync resumes from it
+#   (streams finished before it are synced again from their bookmarks).
+def start_syncing(state, syncing, stream_name):
+    with STATE_LOCK:
+        syncing.append(stream_name)
+        syncing.sort(key=list(STREAMS).index)
+        update_currently_syncing(state, syncing[0])
+
+
+def finish_syncing(state, syncing, stream_name):
+    with STATE_LOCK:
+        syncing.remove(stream_name)
+        update_currently_syncing(state, syncing[0] if syncing else None)
 
 
 # List selected fields from stream catalog
@@ -306,6 +1173,54 @@ def get_selected_fields(catalog, stream_name):
 
 def sync(client, config, catalog, state):
     start_date = config.get('start_date')
+    # Buffered message writer; json_encoder: auto (default), orjson, or json
+    set_writer(MessageWriter(
+        buffer_size=int(config.get('emit_buffer_kb', 1024)) * 1024,
+        encoder=get_encoder(config.get('json_encoder'))))
+    # Number of files fetched in parallel for each search page; default = 1 (sequential)
+    max_concurrent_fetches = int(config.get('max_concurrent_fetches', 1))
+    # File listing mode by stream: search (default) or tree
+    list_modes = config.get('list_modes', {})
+    # Download raw file bodies instead of JSON w/ base64 content
+    raw_downloads = config.get('raw_downloads', False)
+    # Transform the csv records of each file column-wise (same output as row-wise); memoized by
+    #   distinct column value: only faster for files w/ repeated values, uses more memory
+    columnar_transform = config.get('columnar_transform', False)
+    # Strict: records that do not match the schema fail the sync (same as singer.Transformer)
+    strict_conform = config.get('strict_conform', True)
+    # Worker processes for csv parsing/transform; default = 0 (in-process)
+    parse_processes = int(config.get('parse_processes', 0))
+    # Top-level streams synced in parallel; default = 1 (sequential)
+    parallel_streams = int(config.get('parallel_streams', 1))
+    process_pool = None
+    if parse_processes > 0:
+        process_pool = futures.ProcessPoolExecutor(
+            max_workers=parse_processes,
+            mp_context=multiprocessing.get_context(get_process_start_method()))
+    # Local git checkouts by repository (e.g. CSSEGISandData/COVID-19), instead of the API
+    local_repositories = config.get('local_repositories', {})
+    # Row-level change detection: local store of row fingerprints by file; only inserted or
+    #   modified rows of changed files are written, and (row_delete_markers) deleted rows
+    row_fingerprints = None
+    if config.get('row_fingerprints_path'):
+        row_fingerprints = RowFingerprints(config.get('row_fingerprints_path'))
+    delete_markers = config.get('row_delete_markers', False)
+    # Checkpoint (files completed and running max bookmark) after each page, and every N files
+    #   if N > 0; default = 0 (each page)
+    checkpoint_files = int(config.get('checkpoint_files', DEFAULT_CHECKPOINT_FILES))
+    # Memory budget (MB) for the files fetched and parsed ahead of emission; default: no budget
+    memory_budget = None
+    if config.get('max_buffer_mb'):
+        memory_budget = MemoryBudget(int(float(config.get('max_buffer_mb')) * 1024 * 1024))
+    # Phase timers and counters (list, fetch, decode, parse, transform, conform, emit) by stream
+    profiler = None
+    if config.get('phase_metrics', False):
+        profiler = Profiler()
+    set_profiler(profiler)
+    # Local blob cache (keyed by git sha) of previously fetched files
+    cache = None
+    if config.get('cache_path'):
+        cache = BlobCache(config.get('cache_path'), config.get('cache_max_mb'))
 
     # Get selected_streams from catalog, based on state last_stream
     #   last_stream = Previous currently synced stream, if the load was interrupted
@@ -319,25 +1234,70 @@ def sync(client, config, catalog, state):
     if not selected_streams:
         return
 
+    # Sync a (parent) stream and its child streams
+    syncing = []
+    def sync_stream(stream_name, endpoint_config):
+        LOGGER.info('START Syncing Stream: {}'.format(stream_name))
+        start_syncing(state, syncing, stream_name)
+        search_path = endpoint_config.get('search_path', stream_name)
+        bookmark_field = next(iter(endpoint_config.get('replication_keys', [])), None)
+        local_repository = None
+        local_path = local_repositories.get(endpoint_config.get('repository'))
+        if local_path:
+            local_repository = LocalRepository(local_path)
+        total_records = sync_endpoint(
+            client=client,
+            catalog=catalog,
+            state=state,
+            start_date=start_date,
+            stream_name=stream_name,
+            search_path=search_path,
+            endpoint_config=endpoint_config,
+            bookmark_field=bookmark_field,
+            selected_streams=selected_streams,
+            max_concurrent_fetches=max_concurrent_fetches,
+            cache=cache,
+            list_mode=list_modes.get(stream_name, endpoint_config.get('list_mode', 'search')),
+            raw_downloads=raw_downloads,
+            columnar_transform=columnar_transform,
+            strict_conform=strict_conform,
+            process_pool=process_pool,
+            local_repository=local_repository,
+            row_fingerprints=row_fingerprints,
+            delete_markers=delete_markers,
+            checkpoint_files=checkpoint_files,
+            memory_budget=memory_budget)
+
+        finish_syncing(state, syncing, stream_name)
+        LOGGER.info('FINISHED Syncing Stream: {}, total_records: {}'.format(
+            stream_name,
+            total_records))
+        if profiler:
+            profiler.log_metrics(stream_name)
+            for child_stream_name in endpoint_config.get('children', {}):
+                profiler.log_metrics(child_stream_name)
+
     # Loop through selected_streams
-    for stream_name, endpoint_config in STREAMS.items():
-        if stream_name in selected_streams:
-            LOGGER.info('START Syncing Stream: {}'.format(stream_name))
-            update_currently_syncing(state, stream_name)
-            search_path = endpoint_config.get('search_path', stream_name)
-            bookmark_field = next(iter(endpoint_config.get('replication_keys', [])), None)
-            total_records = sync_endpoint(
-                client=client,
-                catalog=catalog,
-                state=state,
-                start_date=start_date,
-                stream_name=stream_name,
-                search_path=search_path,
-                endpoint_config=endpoint_config,
-                bookmark_field=bookmark_field,
-                selected_streams=selected_streams)
-
-            update_currently_syncing(state, None)
-            LOGGER.info('FINISHED Syncing Stream: {}, total_records: {}'.format(
-                stream_name,
-                total_records))
+    #   parallel_streams > 1: streams (different repositories) are synced in parallel threads
+    stream_items = [(stream_name, endpoint_config)
+                    for stream_name, endpoint_config in STREAMS.items()
+                    if stream_name in selected_streams]
+    try:
+        if parallel_streams > 1 and len(stream_items) > 1:
+            with futures.ThreadPoolExecutor(max_workers=parallel_streams) as stream_executor:
+                stream_futures = [stream_executor.submit(sync_stream, stream_name, endpoint_config)
+                                  for stream_name, endpoint_config in stream_items]
+                # Raise the first error (in STREAMS order)
+                for stream_future in stream_futures:
+                    stream_future.result()
+        else:
+            for stream_name, endpoint_config in stream_items:
+                sync_stream(stream_name, endpoint_config)
+    finally:
+        # Worker processes are stopped if the sync fails, too
+        if process_pool:
+            process_pool.shutdown(wait=True)
+
+    get_writer().flush()
+    if profiler:
+        profiler.log_summary()
@@ -65,193 +65,321 @@ us_state_abbrev = {
 }
 
 
-# CSV headers
-# Initial: Province/State,Country/Region,Last Update,Confirmed,Deaths,Recovered
-# 03-01-2020: Province/State,Country/Region,Last Update,Confirmed,Deaths,Recovered,Latitude,Longitude
-# O3-23-2020: FIPS,Admin2,Province_State,Country_Region,Last_Update,Lat,Long_,Confirmed,Deaths,Recovered,Active,Combined_Key
-# Date formats: 1/22/2020 17:00, 2020-02-02T23:43:02
-def transform_jh_csse_daily(record):
-    # Header key variations for each field:
-    province_state_keys = ['Province/State', 'Province_State']
-    country_region_keys = ['Country/Region', 'Country_Region']
-    last_update_keys = ['Last Update', 'Last_Update']
-    confirmed_keys = ['Confirmed']
-    deaths_keys = ['Deaths']
-    recovered_keys = ['Recovered']
-    latitude_keys = ['Latitude', 'Lat']
-    longitude_keys = ['Longitude', 'Long_']
-    active_keys = ['Active']
-    combined_keys = ['Combined_Key']
-    fips_keys = ['FIPS']
-    admin_keys = ['Admin2']
-
-    # Git file fields
-    file_name = record.get('git_file_name')
-    new_record = {}
-    new_record['git_path'] = record.get('git_path')
-    new_record['git_sha'] = record.get('git_sha')
-    new_record['git_last_modified'] = record.get('git_last_modified')
-    new_record['git_file_name'] = file_name
-    new_record['row_number'] = record.get('row_number')
-
-    # Date/Datetime from file_name
-    timezone = pytz.timezone('UTC')
-    file_date_str = file_name.lower().replace('.csv', '')
-    file_dttm = timezone.localize(datetime.strptime(file_date_str, '%m-%d-%Y'))
-    file_dttm_str = strftime(file_dttm)
-    file_date_str = file_dttm_str[:10]
-    new_record['date'] = file_date_str
-    new_record['datetime'] = file_dttm_str
-
-    # For US State code lookup
-    abbrev_us_state = dict(map(reversed, us_state_abbrev.items()))
-
-    # Loop thru keys/values
-    is_a_cruise = False
-    county = None
-    for key, val in list(record.items()):
-        # Trim keys
-        key = str(key).strip()
-        if isinstance(val, str):
-            val = val.strip()
-        if val == '':
-            val = None
-
-        # Replace key/values and field transformations, cleansing
-        if key in province_state_keys:
-            if val is None or val == '':
-                val = 'None'
-            vals = []
-            vals = val.split(',')
-            val_len = len(vals)
-            if val_len == 0:
-                new_val = None
-            elif val_len == 1:
-                state = abbrev_us_state.get(val)
-                if state:
-                    new_val = state
-                else:
-                    new_val = val
-            else:
-                for value in vals:
-                    # Trim new_val
-                    new_val = str(value).strip()
-                    if 'county' in new_val.lower():
-                        county = new_val.replace('County', '').replace('county', '').strip()
-
-                    # Lookup State code to get State Name
-                    state = abbrev_us_state.get(new_val)
-                    if state:
-                        new_val = state
-
-            if 'cruise' in new_val.lower() or 'princess' in new_val.lower() or 'from' \
-                in new_val.lower():
-                is_a_cruise = True
+# For US State code lookup
+abbrev_us_state = dict(map(reversed, us_state_abbrev.items()))
+
+UTC = pytz.timezone('UTC')
 
-            if new_val is None or new_val == '':
-                new_val = 'None'
 
-            new_record['province_state'] = new_val
-            new_record['county'] = county
+# Field value converters (shared by the transformers)
+def to_integer(val):
+    try:
+        new_val = int(val)
+    except Exception as err:
+        new_val = 0
+    return new_val
 
-        elif key in country_region_keys:
-            # Remove punctuation
-            new_val = val.translate(str.maketrans('', '', string.punctuation))
 
-            if 'cruise' in new_val.lower() or 'princess' in new_val.lower() or 'from' \
-                in new_val.lower():
+# Latitude/Longitude: round to 10 places, 0.0 is null
+def to_coordinate(val):
+    new_val = None
+    try:
+        new_val = round(float(val), 10)
+    except Exception as err:
+        pass
+    if new_val == 0.0:
+        new_val = None
+    return new_val
+
+
+def to_string(val):
+    return val
+
+
+def is_cruise(val):
+    return 'cruise' in val.lower() or 'princess' in val.lower() or 'from' in val.lower()
+
+
+# Trim values, nullify empty string
+def clean_value(val):
+    if isinstance(val, str):
+        val = val.strip()
+    if val == '':
+        val = None
+    return val
+
+
+# Per-file metadata, shared by the rows of a csv file: the git_* fields of its records
+class FileInfo(object):
+    __slots__ = ['path', 'sha', 'last_modified', 'name']
+
+    def __init__(self, path, sha, last_modified, name):
+        self.path = path
+        self.sha = sha
+        self.last_modified = last_modified
+        self.name = name
+
+
+# Base class for prepared (per-file) transformers
+#   Created once per CSV file from its file name and header row; transform_row(row, row_number,
+#   file_info) is called for each csv row (list of values, by header column) w/ the shared
+#   FileInfo; the new_record is the only dict built for the row. Per-file invariants (date from
+#   file name, header column lookups) are computed once.
+#   handlers: [(header_key, handler)], handler(new_record, val) sets the new_record field(s)
+#   transform(record): same for a csv record (dict), for the per-record transform functions
+class FileTransformer(object):
+    # Header key (stripped) -> field handler
+    field_handlers = {}
+
+    def __init__(self, file_name, header):
+        self.file_name = file_name
+        self.file_error = None
+        self.file_date = None
+        self.file_datetime = None
+        try:
+            file_dttm = self.parse_file_date(file_name)
+            self.file_datetime = strftime(file_dttm)
+            self.file_date = self.file_datetime[:10]
+        except Exception as err:
+            self.file_error = err
+
+        self.handlers = []
+        # row_handlers: [(column index, handler)]; a repeated header key is the value of its last
+        #   column (same as the csv.DictReader record)
+        self.row_handlers = []
+        header = list(header or [])
+        indexes = dict((key, index) for index, key in enumerate(header))
+        # Unique header keys, in order (same as the csv.DictReader record keys)
+        for key in dict.fromkeys(header):
+            handler = self.field_handlers.get(str(key).strip())
+            if handler:
+                self.handlers.append((key, handler))
+                self.row_handlers.append((indexes[key], handler))
+
+    def parse_file_date(self, file_name):
+        raise NotImplementedError()
+
+    # Record for a file w/o a valid date in the file name
+    def skip_file(self):
+        raise self.file_error
+
+    def new_record(self, record):
+        return self.new_file_record(record.get('git_path'), record.get('git_sha'),
+                                    record.get('git_last_modified'), record.get('row_number'))
+
+    def new_file_record(self, git_path, git_sha, git_last_modified, row_number):
+        # Git file fields
+        new_record = {}
+        new_record['git_path'] = git_path
+        new_record['git_sha'] = git_sha
+        new_record['git_last_modified'] = git_last_modified
+        new_record['git_file_name'] = self.file_name
+        new_record['row_number'] = row_number
+        new_record['date'] = self.file_date
+        new_record['datetime'] = self.file_datetime
+        return new_record
+
+    def finish_record(self, new_record, is_a_cruise):
+        return new_record
+
+    def transform(self, record):
+        if self.file_error:
+            return self.skip_file()
+        new_record = self.new_record(record)
+
+        # Loop thru keys/values
+        is_a_cruise = False
+        for key, handler in self.handlers:
+            # Replace key/values and field transformations, cleansing
+            if handler(new_record, clean_value(record.get(key))):
                 is_a_cruise = True
 
-            # Replace country names
-            if val == 'Korea South':
-                new_val = 'South Korea'
-            elif val == 'US':
-                new_val = 'United States'
+        return self.finish_record(new_record, is_a_cruise)
+
+    # Compact row (csv values, by column) of the file_info file; short rows are padded w/ None
+    def transform_row(self, row, row_number, file_info):
+        if self.file_error:
+            return self.skip_file()
+        new_record = self.new_file_record(
+            file_info.path, file_info.sha, file_info.last_modified, row_number)
 
-            new_record['country_region'] = new_val
+        is_a_cruise = False
+        row_length = len(row)
+        for index, handler in self.row_handlers:
+            val = row[index] if index < row_length else None
+            if handler(new_record, clean_value(val)):
+                is_a_cruise = True
 
-        elif key in last_update_keys:
+        return self.finish_record(new_record, is_a_cruise)
+
+    # Columnar transform of the compact rows of a file (row_number from 1), same output as
+    #   transform_row() for each row. Each column is cleansed and converted once per distinct
+    #   value (e.g. Last_Update, Country_Region repeat for thousands of county rows); records are
+    #   built at the end. Not vectorized: only faster for columns w/ repeated values, and holds
+    #   all rows of the file.
+    def transform_row_columns(self, rows, file_info):
+        if self.file_error:
+            return [self.skip_file() for row in rows]
+
+        columns = []
+        for index, handler in self.row_handlers:
+            columns.append([clean_value(row[index] if index < len(row) else None)
+                            for row in rows])
+        new_records = [self.new_file_record(file_info.path, file_info.sha,
+                                            file_info.last_modified, row_number)
+                       for row_number in range(1, len(rows) + 1)]
+        return self.build_records(columns, new_records)
+
+    # Convert the (cleansed) columns, in handlers order, into the new_records
+    def build_records(self, columns, new_records):
+        handlers = [handler for key, handler in self.handlers]
+        converted_columns = []
+        for handler, column in zip(handlers, columns):
+            converted = {}
+            for val in dict.fromkeys(column):
+                fields = {}
+                is_a_cruise = handler(fields, val)
+                converted[val] = (fields, is_a_cruise)
+            converted_columns.append([converted[val] for val in column])
+
+        rows_fields = [()] * len(new_records)
+        if converted_columns:
+            rows_fields = zip(*converted_columns)
+        finished_records = []
+        for new_record, row_fields in zip(new_records, rows_fields):
+            is_a_cruise = False
+            for fields, field_is_a_cruise in row_fields:
+                new_record.update(fields)
+                if field_is_a_cruise:
+                    is_a_cruise = True
+            finished_records.append(self.finish_record(new_record, is_a_cruise))
+        return finished_records
+
+
+# Handlers set a single field, returns True if the value is a cruise (jh_csse_daily)
+def set_field(field_name, convert):
+    def handler(new_record, val):
+        new_record[field_name] = convert(val)
+        return False
+    return handler
+
+
+# Province/State, may be a list: City, County, State code
+def set_province_state(new_record, val):
+    county = None
+    if val is None or val == '':
+        val = 'None'
+    vals = []
+    vals = val.split(',')
+    val_len = len(vals)
+    if val_len == 0:
+        new_val = None
+    elif val_len == 1:
+        state = abbrev_us_state.get(val)
+        if state:
+            new_val = state
+        else:
             new_val = val
-            # Try format 1
-            try:
-                new_val = strftime(timezone.localize(datetime.strptime(val, '%Y-%m-%dT%H:%M:%S')))
-            except Exception as err:
-                pass
-            # Try format 2
-            try:
-                new_val = strftime(timezone.localize(datetime.strptime(val, '%m/%d/%Y %H:%M')))
-            except Exception as err:
-                pass
-            new_record['last_update'] = new_val
-
-        elif key in confirmed_keys:
-            try:
-                new_val = int(val)
-            except Exception as err:
-                new_val = 0
-                pass
-            new_record['confirmed'] = new_val
-
-        elif key in deaths_keys:
-            new_val = 0
-            try:
-                new_val = int(val)
-            except Exception as err:
-                pass
-            new_record['deaths'] = new_val
-
-        elif key in recovered_keys:
-            new_val = 0
-            try:
-                new_val = int(val)
-            except Exception as err:
-                pass
-            new_record['recovered'] = new_val
-
-        elif key in latitude_keys:
-            new_val = None
-            try:
-                new_val = round(float(val), 10)
-            except Exception as err:
-                pass
-            if new_val == 0.0:
-                new_val = None
-            new_record['latitude'] = new_val
-
-        elif key in longitude_keys:
-            new_val = None
-            try:
-                new_val = round(float(val), 10)
-            except Exception as err:
-                pass
-            if new_val == 0.0:
-                new_val = None
-            new_record['longitude'] = new_val
-
-        elif key in active_keys:
-            try:
-                new_val = int(val)
-            except Exception as err:
-                new_val = 0
-            new_record['active'] = new_val
-
-        elif key in combined_keys:
-            new_record['combined_key'] = val
-
-        elif key in fips_keys:
-            new_record['fips'] = val
-
-        elif key in admin_keys:
-            new_record['admin_area'] = val
-
-        # End keys loop
-
-    new_record['is_a_cruise'] = is_a_cruise
-
-    if new_record.get('province_state') is None:
-        new_record['province_state'] = 'None'
+    else:
+        for value in vals:
+            # Trim new_val
+            new_val = str(value).strip()
+            if 'county' in new_val.lower():
+                county = new_val.replace('County', '').replace('county', '').strip()
+
+            # Lookup State code to get State Name
+            state = abbrev_us_state.get(new_val)
+            if state:
+                new_val = state
+
+    cruise = is_cruise(new_val)
+
+    if new_val is None or new_val == '':
+        new_val = 'None'
+
+    new_record['province_state'] = new_val
+    new_record['county'] = county
+    return cruise
+
+
+def set_country_region(new_record, val):
+    # Remove punctuation
+    new_val = val.translate(str.maketrans('', '', string.punctuation))
+
+    cruise = is_cruise(new_val)
+
+    # Replace country names
+    if val == 'Korea South':
+        new_val = 'South Korea'
+    elif val == 'US':
+        new_val = 'United States'
+
+    new_record['country_region'] = new_val
+    return cruise
+
+
+def to_last_update(val):
+    new_val = val
+    # Try format 1
+    try:
+        new_val = strftime(UTC.localize(datetime.strptime(val, '%Y-%m-%dT%H:%M:%S')))
+    except Exception as err:
+        pass
+    # Try format 2
+    try:
+        new_val = strftime(UTC.localize(datetime.strptime(val, '%m/%d/%Y %H:%M')))
+    except Exception as err:
+        pass
+    return new_val
+
+
+# CSV headers
+# Initial: Province/State,Country/Region,Last Update,Confirmed,Deaths,Recovered
+# 03-01-2020: Province/State,Country/Region,Last Update,Confirmed,Deaths,Recovered,Latitude,Longitude
+# O3-23-2020: FIPS,Admin2,Province_State,Country_Region,Last_Update,Lat,Long_,Confirmed,Deaths,Recovered,Active,Combined_Key
+# Date formats: 1/22/2020 17:00, 2020-02-02T23:43:02
+class JhCsseDailyTransformer(FileTransformer):
+    # Header key variations for each field:
+    field_handlers = {
+        'Province/State': set_province_state,
+        'Province_State': set_province_state,
+        'Country/Region': set_country_region,
+        'Country_Region': set_country_region,
+        'Last Update': set_field('last_update', to_last_update),
+        'Last_Update': set_field('last_update', to_last_update),
+        'Confirmed': set_field('confirmed', to_integer),
+        'Deaths': set_field('deaths', to_integer),
+        'Recovered': set_field('recovered', to_integer),
+        'Latitude': set_field('latitude', to_coordinate),
+        'Lat': set_field('latitude', to_coordinate),
+        'Longitude': set_field('longitude', to_coordinate),
+        'Long_': set_field('longitude', to_coordinate),
+        'Active': set_field('active', to_integer),
+        'Combined_Key': set_field('combined_key', to_string),
+        'FIPS': set_field('fips', to_string),
+        'Admin2': set_field('admin_area', to_string)
+    }
+
+    # Date/Datetime from file_name ( e.g. 03-23-2020.csv )
+    def parse_file_date(self, file_name):
+        file_date_str = file_name.lower().replace('.csv', '')
+        return UTC.localize(datetime.strptime(file_date_str, '%m-%d-%Y'))
+
+    def finish_record(self, new_record, is_a_cruise):
+        new_record['is_a_cruise'] = is_a_cruise
+
+        if new_record.get('province_state') is None:
+            new_record['province_state'] = 'None'
+
+        return new_record
+
+
+# date_of_notification (data) e.g. 2020-03-26T17:00:00
+# TODO confirm datetime values are UTC (or are they Italy local time ?)
+def to_notification_datetime(val):
+    # TODO catch and ignore any error parsing the date
+    return strftime(UTC.localize(datetime.strptime(val, '%Y-%m-%dT%H:%M:%S')))
 
-    return new_record
 
 # JSCOTT added transformer for Italy Region
 # Italy by Region, Daily
@@ -259,238 +387,114 @@ def transform_jh_csse_daily(record):
 # 1. Column names are translated to english (see comments inline below)
 # 2. We return a None record for file names that do NOT end with a date part (e.g. dpc-covid19-ita-regioni-latest.csv)
 #    because these (we assume) have redundant info that we dont want to duplicate
-def transform_italy_regions_daily(record):
-
-    # Header key variations for each field
+class ItalyRegionsDailyTransformer(FileTransformer):
+    # Header key for each field
     # NOTE: We translate italian column names to english
-    date_of_notification_keys = ['data']
-    country_keys = ['stato']
-    region_code_keys = ['codice_regione']
-    region_keys = ['denominazione_regione']
-    latitude_keys = ['lat']
-    longitude_keys = ['long']
-    hospitalized_with_symptoms_keys = ['ricoverati_con_sintomi']
-    intensive_care_keys = ['terapia_intensiva']
-    total_hospitalized_keys = ['totale_ospedalizzati']
-    home_isolation_keys = ['isolamento_domiciliare']
-    total_currently_positive_keys = ['totale_attualmente_positivi']
-    new_currently_positive_keys = ['nuovi_attualmente_positivi']
-    discharged_recovered_keys = ['dimessi_guariti']
-    deaths_keys = ['deceduti']
-    total_cases_keys = ['totale_casi']
-    tests_performed_keys= ['tamponi']
-    note_it_keys = ['note_it']
-    note_en_keys = ['note_en']
-
-    # TODO not used: Remove
-    translations = [
-        {'it': 'data',                          'en': 'notification_date'},
-        {'it': 'stato',                         'en': 'country'},
-        {'it': 'codice_regione',                'en': 'region_code'},
-        {'it': 'denominazione_regione',         'en': 'region'},
-        {'it': 'lat',                           'en': 'lat'},
-        {'it': 'long',                          'en': 'long'},
-        {'it': 'ricoverati_con_sintomi',        'en': 'hospitalized_with_symptoms'},
-        {'it': 'terapia_intensiva',             'en': 'intensive_care'},
-        {'it': 'totale_ospedalizzati',          'en': 'total_hospitalized'},
-        {'it': 'isolamento_domiciliare',        'en': 'home_isolation'},
-        {'it': 'totale_attualmente_positivi',   'en': 'total_currently_positive'},
-        {'it': 'nuovi_attualmente_positivi',    'en': 'new_currently_positive'},
-        {'it': 'dimessi_guariti',               'en': 'discharged_recovered'},
-        {'it': 'deceduti',                      'en': 'deaths'},
-        {'it': 'totale_casi',                   'en': 'total_cases'},
-        {'it': 'tamponi',                       'en': 'tests_performed'},
-        {'it': 'note_it',                       'en': 'note_it'},
-        {'it': 'note_en',                       'en': 'note_en'}
-    ],
-
-    # Git file fields
-    file_name = record.get('git_file_name')
-    new_record = {}
-    new_record['git_path'] = record.get('git_path')
-    new_record['git_sha'] = record.get('git_sha')
-    new_record['git_last_modified'] = record.get('git_last_modified')
-    new_record['git_file_name'] = file_name
-    new_record['row_number'] = record.get('row_number')
-
-    # Date/Datetime from file_name ( e.g. dpc-covid19-ita-regioni-20200326.csv )
-    timezone = pytz.timezone('UTC')
-    file_name_part = file_name.lower().replace('.csv', '')
-    file_date_str = file_name_part[-8:]
-    try:
-        file_dttm = timezone.localize(datetime.strptime(file_date_str, '%Y%m%d'))
-    except Exception as err:
-        # exit and skip this record because since we can't determine the date,
-        # it is from a file we want to ignore
-        return None
-    file_dttm_str = strftime(file_dttm)
-    file_date_str = file_dttm_str[:10]
-    # TODO date and notification_date are redundant. pick one ?
-    new_record['date'] = file_date_str
-    new_record['datetime'] = file_dttm_str
-
-    # For US State code lookup
-    # abbrev_us_state = dict(map(reversed, us_state_abbrev.items()))
-
-    # Loop thru keys/values
-    for key, val in list(record.items()):
-
-        # Trim keys, nullify empty string
-        key = str(key).strip()
-        if isinstance(val, str):
-            val = val.strip()
-        if val == '':
-            val = None
-
-        # Replace key/values and field transformations, cleansing:
-
-        # date_of_notification (data) e.g. 2020-03-26T17:00:00
-        # TODO confirm datetime values are UTC (or are they Italy local time ?)
-        if key in date_of_notification_keys:
-            # TODO catch and ignore any error parsing the date
-            new_val = strftime(timezone.localize(datetime.strptime(val, '%Y-%m-%dT%H:%M:%S')))
-            new_record['date_of_notification'] = new_val
-
+    field_handlers = {
+        # date_of_notification (data)
+        'data': set_field('date_of_notification', to_notification_datetime),
         # country (stato), should always be 'ITA'
-        elif key in country_keys:
-            new_record['country'] = val
-
+        'stato': set_field('country', to_string),
         # region_code (codice_regione) is a number
-        elif key in region_code_keys:
-            try:
-                new_val = int(val)
-            except Exception as err:
-                new_val = 0
-                pass
-            new_record['region_code'] = new_val
-
+        'codice_regione': set_field('region_code', to_integer),
         # region (denominazione_regione), e.g. 'Lombardia
-        elif key in region_keys:
-            new_record['region'] = val
-
+        'denominazione_regione': set_field('region', to_string),
         # latitude (lat) is a float
-        elif key in latitude_keys:
-            new_val = None
-            try:
-                new_val = round(float(val), 10)
-            except Exception as err:
-                pass
-            if new_val == 0.0:
-                new_val = None
-            new_record['latitude'] = new_val
-
+        'lat': set_field('latitude', to_coordinate),
         # longitude (long) is a float
-        elif key in longitude_keys:
-            new_val = None
-            try:
-                new_val = round(float(val), 10)
-            except Exception as err:
-                pass
-            if new_val == 0.0:
-                new_val = None
-            new_record['longitude'] = new_val
-
+        'long': set_field('longitude', to_coordinate),
         # hospitalized_with_symptoms (ricoverati_con_sintomi) is an integer
-        elif key in hospitalized_with_symptoms_keys:
-            try:
-                new_val = int(val)
-            except Exception as err:
-                new_val = 0
-                pass
-            new_record['hospitalized_with_symptoms_keys'] = new_val
-
+        'ricoverati_con_sintomi': set_field('hospitalized_with_symptoms_keys', to_integer),
         # intensive_care (terapia_intensiva) is an integer
-        elif key in intensive_care_keys:
-            try:
-                new_val = int(val)
-            except Exception as err:
-                new_val = 0
-                pass
-            new_record['intensive_care'] = new_val
-
+        'terapia_intensiva': set_field('intensive_care', to_integer),
         # total_hospitalized (totale_ospedalizzati) is an integer
-        elif key in total_hospitalized_keys:
-            try:
-                new_val = int(val)
-            except Exception as err:
-                new_val = 0
-                pass
-            new_record['total_hospitalized'] = new_val
-
-        # home_isolation (totale_ospedalizzati) is an integer
-        elif key in home_isolation_keys:
-            try:
-                new_val = int(val)
-            except Exception as err:
-                new_val = 0
-                pass
-            new_record['home_isolation'] = new_val
-
+        'totale_ospedalizzati': set_field('total_hospitalized', to_integer),
+        # home_isolation (isolamento_domiciliare) is an integer
+        'isolamento_domiciliare': set_field('home_isolation', to_integer),
         # total_currently_positive (totale_attualmente_positivi) is an integer
-        elif key in total_currently_positive_keys:
-            try:
-                new_val = int(val)
-            except Exception as err:
-                new_val = 0
-                pass
-            new_record['total_currently_positive'] = new_val
-
+        'totale_attualmente_positivi': set_field('total_currently_positive', to_integer),
         # new_currently_positive (nuovi_attualmente_positivi) is an integer
-        elif key in new_currently_positive_keys:
-            try:
-                new_val = int(val)
-            except Exception as err:
-                new_val = 0
-                pass
-            new_record['new_currently_positive'] = new_val
-
+        'nuovi_attualmente_positivi': set_field('new_currently_positive', to_integer),
         # discharged_recovered (dimessi_guariti) is an integer
-        elif key in discharged_recovered_keys:
-            try:
-                new_val = int(val)
-            except Exception as err:
-                new_val = 0
-                pass
-            new_record['discharged_recovered'] = new_val
-
+        'dimessi_guariti': set_field('discharged_recovered', to_integer),
         # deaths (deceduti) is an integer
-        elif key in deaths_keys:
-            try:
-                new_val = int(val)
-            except Exception as err:
-                new_val = 0
-                pass
-            new_record['deaths'] = new_val
-
+        'deceduti': set_field('deaths', to_integer),
         # total_cases (totale_casi) is an integer
-        elif key in total_cases_keys:
-            try:
-                new_val = int(val)
-            except Exception as err:
-                new_val = 0
-                pass
-            new_record['total_cases'] = new_val
-
+        'totale_casi': set_field('total_cases', to_integer),
         # tests_performed (tamponi) is an integer
-        elif key in tests_performed_keys:
-            try:
-                new_val = int(val)
-            except Exception as err:
-                new_val = 0
-                pass
-            new_record['tests_performed'] = new_val
-
+        'tamponi': set_field('tests_performed', to_integer),
         # notes in italian
-        elif key in note_it_keys:
-            new_record['note_it'] = val
-
+        'note_it': set_field('note_it', to_string),
         # notes in english
-        elif key in note_en_keys:
-            new_record['note_en'] = val
+        'note_en': set_field('note_en', to_string)
+    }
 
-        # End keys loop
+    # Date/Datetime from file_name ( e.g. dpc-covid19-ita-regioni-20200326.csv )
+    def parse_file_date(self, file_name):
+        file_name_part = file_name.lower().replace('.csv', '')
+        file_date_str = file_name_part[-8:]
+        return UTC.localize(datetime.strptime(file_date_str, '%Y%m%d'))
+
+    # skip the records because since we can't determine the date,
+    # it is from a file we want to ignore
+    def skip_file(self):
+        return None
 
-    return new_record
+
+# Streams w/o a file transformer: records are not transformed
+class PassThroughTransformer(object):
+    def __init__(self, header=None):
+        self.header = list(header or [])
+
+    def transform(self, record):
+        return record
+
+    # Compact row -> csv record (same as csv.DictReader) w/ the git file fields
+    def transform_row(self, row, row_number, file_info):
+        record = dict(zip(self.header, row))
+        if len(row) > len(self.header):
+            record[None] = row[len(self.header):]
+        else:
+            for key in self.header[len(row):]:
+                record[key] = None
+        record['git_path'] = file_info.path
+        record['git_sha'] = file_info.sha
+        record['git_last_modified'] = file_info.last_modified
+        record['git_file_name'] = file_info.name
+        record['row_number'] = row_number
+        return record
+
+    def transform_row_columns(self, rows, file_info):
+        return [self.transform_row(row, row_number, file_info)
+                for row_number, row in enumerate(rows, start=1)]
+
+
+FILE_TRANSFORMERS = {
+    'jh_csse_daily': JhCsseDailyTransformer,
+    'italy_daily_region': ItalyRegionsDailyTransformer
+    # (other streams)
+}
+
+
+# Prepared transformer for a CSV file: created once per file from its name and header row.
+#   transform_row(row, row_number, file_info): per-row, compact row (csv values list) and the
+#       shared FileInfo -> new_record (or None to skip the row)
+#   transform_row_columns(rows, file_info): all rows of the file (columnar), list of new_records
+#   transform(record): per-row, csv record (dict) -> new_record (transform_record)
+def get_file_transformer(stream_name, file_name, header):
+    transformer_class = FILE_TRANSFORMERS.get(stream_name)
+    if transformer_class is None:
+        return PassThroughTransformer(header)
+    return transformer_class(file_name, header)
+
+
+def transform_jh_csse_daily(record):
+    return JhCsseDailyTransformer(record.get('git_file_name'), record.keys()).transform(record)
+
+
+def transform_italy_regions_daily(record):
+    return ItalyRegionsDailyTransformer(
+        record.get('git_file_name'), record.keys()).transform(record)
 
 
 def transform_record(stream_name, record):
@@ -0,0 +1,187 @@
+import io
+import tarfile
+import unittest
+from unittest import mock
+from singer.utils import strptime_to_utc
+from tap_covid_19.archive import ArchiveReader, get_blob_sha
+from tap_covid_19.sync import fetch_archive_file, get_files_last_modified
+
+PREFIX = 'CSSEGISandData-COVID-19-abc1234'
+COMMIT_TIME = 1585000000
+
+FILES = [
+    ('README.md', b'# COVID-19\n'),
+    ('csse_covid_19_data/csse_covid_19_daily_reports/01-22-2020.csv', b'Province/State\nHubei\n'),
+    ('csse_covid_19_data/csse_covid_19_daily_reports/01-23-2020.csv', b'Province/State\nAnhui\n'),
+    ('csse_covid_19_data/csse_covid_19_daily_reports/01-24-2020.csv', b'Province/State\n'),
+    ('csse_covid_19_data/csse_covid_19_daily_reports/README.md', b'# Daily reports\n')
+]
+
+
+class Response(object):
+    def __init__(self, content):
+        self.raw = io.BytesIO(content)
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+# Repository archive (same as GitHub): top-level folder, folder entries, and all mtimes = the
+#   commit time of the ref
+def make_archive(files):
+    output = io.BytesIO()
+    with tarfile.open(fileobj=output, mode='w:gz') as tar:
+        folders = set()
+        for path, content in files:
+            parts = path.split('/')[:-1]
+            for i in range(len(parts) + 1):
+                folder = '/'.join([PREFIX] + parts[:i])
+                if folder not in folders:
+                    folders.add(folder)
+                    info = tarfile.TarInfo(folder)
+                    info.type = tarfile.DIRTYPE
+                    info.mtime = COMMIT_TIME
+                    tar.addfile(info)
+            info = tarfile.TarInfo('{}/{}'.format(PREFIX, path))
+            info.size = len(content)
+            info.mtime = COMMIT_TIME
+            tar.addfile(info, io.BytesIO(content))
+    return output.getvalue()
+
+
+class TestArchiveReader(unittest.TestCase):
+    def setUp(self):
+        self.requests = 0
+        self.response = Response(make_archive(FILES))
+
+    def open_archive(self):
+        self.requests = self.requests + 1
+        return self.response, None
+
+    def test_read_in_order(self):
+        reader = ArchiveReader(self.open_archive)
+        self.assertEqual(self.requests, 0)
+        for path, content in FILES[1:4]:
+            self.assertEqual(reader.read(path), content)
+        self.assertEqual(reader.files, 3)
+        self.assertEqual(self.requests, 1)
+        reader.close()
+        self.assertTrue(self.response.closed)
+
+    def test_skip_files(self):
+        reader = ArchiveReader(self.open_archive)
+        # Files not read (e.g. unchanged) are skipped in the stream
+        self.assertEqual(reader.read(FILES[3][0]), FILES[3][1])
+        self.assertEqual(reader.files, 1)
+
+    def test_missing_path(self):
+        reader = ArchiveReader(self.open_archive)
+        missing_path = 'csse_covid_19_data/csse_covid_19_daily_reports/01-22-2020.xlsx'
+        self.assertIsNone(reader.read(missing_path))
+        # The member after the missing path is kept for the next read
+        self.assertEqual(reader.read(FILES[2][0]), FILES[2][1])
+
+    def test_out_of_order(self):
+        reader = ArchiveReader(self.open_archive)
+        self.assertEqual(reader.read(FILES[2][0]), FILES[2][1])
+        self.assertIsNone(reader.read(FILES[1][0]))
+        self.assertEqual(reader.read(FILES[3][0]), FILES[3][1])
+
+    def test_end_of_archive(self):
+        reader = ArchiveReader(self.open_archive)
+        self.assertIsNone(reader.read('zzz.csv'))
+        self.assertTrue(self.response.closed)
+        self.assertIsNone(reader.read(FILES[1][0]))
+        self.assertEqual(self.requests, 1)
+
+    def test_not_found(self):
+        reader = ArchiveReader(lambda: (None, None))
+        self.assertIsNone(reader.read(FILES[1][0]))
+        self.assertIsNone(reader.read(FILES[2][0]))
+
+    def test_blob_sha(self):
+        # Same as git hash-object
+        self.assertEqual(get_blob_sha(b'hello\n'), 'ce013625030ba8dba906f756967f9e9ca394464a')
+        self.assertEqual(get_blob_sha(b''), 'e69de29bb2d1d6434b8b29ae775ad8c2e48c5391')
+
+
+# Client w/ the last commit date-time of each path (GraphQL history), by path
+class Client(object):
+    def __init__(self, last_modified):
+        self.last_modified = last_modified
+        self.queries = []
+
+    def graphql(self, query, variables=None, endpoint=None):
+        self.queries.append((query, variables))
+        commit = {}
+        for index in range(len(variables) - 3):
+            last_modified = self.last_modified.get(variables['p{}'.format(index)])
+            nodes = [{'committedDate': last_modified}] if last_modified else []
+            commit['f{}'.format(index)] = {'nodes': nodes}
+        return {'repository': {'object': commit}}
+
+
+def get_item(path):
+    return {
+        'name': path.split('/')[-1],
+        'path': path,
+        'sha': get_blob_sha(dict(FILES)[path]),
+        'url': 'https://api.github.com/repos/CSSEGISandData/COVID-19/contents/{}'.format(path)
+    }
+
+
+# Archive mode: last_modified of each file from its history (GraphQL, one request per page of
+#   files), not the archive mtimes
+class TestFetchArchiveFile(unittest.TestCase):
+    def test_files_last_modified(self):
+        items = [get_item(path) for path, content in FILES]
+        client = Client({
+            FILES[1][0]: '2020-01-23T01:00:00Z',
+            FILES[2][0]: '2020-01-24T01:00:00.000+00:00'
+        })
+        with mock.patch('tap_covid_19.sync.GRAPHQL_PAGE_SIZE', 3):
+            files_last_modified = get_files_last_modified(
+                client, 'stream', 'CSSEGISandData/COVID-19', 'master', items)
+        self.assertEqual(files_last_modified, {
+            FILES[0][0]: None,
+            FILES[1][0]: '2020-01-23T01:00:00Z',
+            FILES[2][0]: '2020-01-24T01:00:00Z',
+            FILES[3][0]: None,
+            FILES[4][0]: None
+        })
+        self.assertEqual(len(client.queries), 2)
+        query, variables = client.queries[0]
+        self.assertIn('f2: history(first: 1, path: $p2)', query)
+        self.assertEqual(variables, {
+            'owner': 'CSSEGISandData', 'name': 'COVID-19', 'ref': 'master',
+            'p0': FILES[0][0], 'p1': FILES[1][0], 'p2': FILES[2][0]})
+
+    def test_last_modified(self):
+        items = [get_item(path) for path, content in FILES[1:4]]
+        files_last_modified = {
+            FILES[1][0]: '2020-01-23T01:00:00Z',
+            FILES[2][0]: '2020-01-20T01:00:00Z',
+            FILES[3][0]: '2020-01-25T01:00:00Z'
+        }
+        reader = ArchiveReader(lambda: (Response(make_archive(FILES)), None))
+        last_dttm = strptime_to_utc('2020-01-22T00:00:00Z')
+        results = []
+        for item in items:
+            results.append(fetch_archive_file(
+                reader, Client({}), 'stream', item, {},
+                file_modified=files_last_modified[item.get('path')], last_dttm=last_dttm))
+
+        file_data, content = results[0]
+        self.assertEqual(content, FILES[1][1])
+        self.assertEqual(file_data['last_modified'], '2020-01-23T01:00:00Z')
+        self.assertEqual(file_data['sha'], items[0]['sha'])
+        self.assertEqual(file_data['size'], len(FILES[1][1]))
+        # Not modified since the bookmark: not read
+        self.assertEqual(results[1], (None, None))
+        self.assertEqual(results[2][0]['last_modified'], '2020-01-25T01:00:00Z')
+        self.assertEqual(reader.files, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from singer.utils import strptime_to_utc
+from tap_covid_19.archive import get_blob_sha
+from tap_covid_19.cache import BlobCache
+from tap_covid_19.sync import fetch_file
+
+CONTENT = b'Province/State,Country/Region,Confirmed\nHubei,China,67800\n'
+SHA = get_blob_sha(CONTENT)
+LAST_MODIFIED = '2020-03-24T23:48:20Z'
+
+
+class TestBlobCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_path)
+
+    def test_get_put(self):
+        cache = BlobCache(self.cache_path)
+        self.assertEqual(cache.get(SHA), (None, None))
+        cache.put(SHA, CONTENT, LAST_MODIFIED)
+        self.assertEqual(cache.get(SHA), (LAST_MODIFIED, CONTENT))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # Reloaded from disk
+        cache = BlobCache(self.cache_path)
+        self.assertEqual(cache.total_size, os.path.getsize(
+            os.path.join(self.cache_path, SHA[:2], SHA)))
+        self.assertEqual(cache.get(SHA), (LAST_MODIFIED, CONTENT))
+
+    def test_empty_content(self):
+        cache = BlobCache(self.cache_path)
+        sha = get_blob_sha(b'')
+        cache.put(sha, b'')
+        self.assertEqual(cache.get(sha), (None, b''))
+
+    def test_invalid_sha(self):
+        cache = BlobCache(self.cache_path)
+        for sha in [None, '', 'abc', SHA.upper(), '../' + SHA[3:]]:
+            cache.put(sha, CONTENT, LAST_MODIFIED)
+            self.assertEqual(cache.get(sha), (None, None))
+        self.assertEqual(os.listdir(self.cache_path), [])
+
+    def test_removed_entry(self):
+        cache = BlobCache(self.cache_path)
+        cache.put(SHA, CONTENT, LAST_MODIFIED)
+        os.remove(os.path.join(self.cache_path, SHA[:2], SHA))
+        self.assertEqual(cache.get(SHA), (None, None))
+        self.assertEqual(cache.total_size, 0)
+
+    def test_evict_lru(self):
+        contents = [CONTENT + str(index).encode('utf-8') for index in range(3)]
+        shas = [get_blob_sha(content) for content in contents]
+        cache = BlobCache(self.cache_path)
+        cache.put(shas[0], contents[0])
+        entry_size = cache.total_size
+        # Fits 2 entries
+        cache = BlobCache(self.cache_path, max_size_mb=(entry_size * 2.5) / (1024 * 1024))
+        cache.put(shas[1], contents[1])
+        self.assertEqual(cache.get(shas[0]), (None, contents[0]))
+        cache.put(shas[2], contents[2])
+        self.assertEqual(cache.total_size, entry_size * 2)
+        self.assertEqual(cache.get(shas[1]), (None, None))
+        self.assertFalse(os.path.exists(os.path.join(self.cache_path, shas[1][:2], shas[1])))
+        self.assertEqual(cache.get(shas[0]), (None, contents[0]))
+        self.assertEqual(cache.get(shas[2]), (None, contents[2]))
+
+    def test_full_metadata_entry(self):
+        # Entries w/ all of the file_data in the metadata line
+        os.makedirs(os.path.join(self.cache_path, SHA[:2]))
+        file_data = {'name': '03-23-2020.csv', 'path': 'x/03-23-2020.csv', 'sha': SHA,
+                     'size': len(CONTENT), 'last_modified': LAST_MODIFIED}
+        with open(os.path.join(self.cache_path, SHA[:2], SHA), 'wb') as file:
+            file.write(json.dumps(file_data).encode('utf-8') + b'\n' + CONTENT)
+        self.assertEqual(BlobCache(self.cache_path).get(SHA), (LAST_MODIFIED, CONTENT))
+
+
+class Client(object):
+    def get(self, url=None, headers=None, endpoint=None):
+        raise AssertionError('Not cached: {}'.format(url))
+
+
+# Cache hits: file_data from the listed item, not the item the blob was cached for
+class TestFetchFileCached(unittest.TestCase):
+    def setUp(self):
+        self.cache_path = tempfile.mkdtemp()
+        self.cache = BlobCache(self.cache_path)
+        self.cache.put(SHA, CONTENT, LAST_MODIFIED)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_path)
+
+    def test_item_file_data(self):
+        path = 'dati-regioni/dpc-covid19-ita-regioni-latest.csv'
+        item = {
+            'name': 'dpc-covid19-ita-regioni-latest.csv',
+            'path': path,
+            'sha': SHA,
+            'url': 'https://api.github.com/repositories/1/contents/{}?ref=abc123'.format(path),
+            'git_url': 'https://api.github.com/repositories/1/git/blobs/{}'.format(SHA),
+            'html_url': 'https://github.com/pcm-dpc/COVID-19/blob/abc123/{}'.format(path),
+            'repository': {'full_name': 'pcm-dpc/COVID-19'},
+            'score': 1.0
+        }
+        file_data, content = fetch_file(Client(), 'italy_daily_files', item, {},
+                                        cache=self.cache)
+        self.assertEqual(content, CONTENT)
+        self.assertEqual(file_data, {
+            'name': item['name'],
+            'path': path,
+            'sha': SHA,
+            'size': len(CONTENT),
+            'url': item['url'],
+            'git_url': item['git_url'],
+            'html_url': item['html_url'],
+            'download_url': 'https://raw.githubusercontent.com/pcm-dpc/COVID-19/abc123/{}'.format(
+                path),
+            'type': 'file',
+            'encoding': 'base64',
+            'last_modified': LAST_MODIFIED
+        })
+
+        file_data, content = fetch_file(Client(), 'italy_daily_files', item, {},
+                                        cache=self.cache, raw_downloads=True)
+        self.assertNotIn('encoding', file_data)
+        self.assertEqual(file_data['size'], len(CONTENT))
+
+    def test_not_modified(self):
+        item = {'name': 'a.csv', 'path': 'a.csv', 'sha': SHA, 'url': 'https://x/a.csv'}
+        last_dttm = strptime_to_utc(LAST_MODIFIED)
+        self.assertEqual(fetch_file(Client(), 'italy_daily_files', item, {},
+                                    cache=self.cache, last_dttm=last_dttm), (None, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
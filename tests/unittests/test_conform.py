@@ -0,0 +1,138 @@
+import os
+import unittest
+from singer import metadata, Transformer
+from singer.catalog import Catalog
+from singer.transform import SchemaMismatch
+from tap_covid_19.conform import RecordConformer, get_conformer
+from tap_covid_19.discover import discover
+from tap_covid_19.sync import iter_csv_records
+
+FIXTURES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__)))),
+    'benchmarks', 'fixtures')
+
+
+# Catalog w/ all streams and fields selected
+def get_selected_catalog():
+    catalog = discover().to_dict()
+    for stream in catalog['streams']:
+        for entry in stream['metadata']:
+            entry['metadata']['selected'] = True
+    return Catalog.from_dict(catalog)
+
+
+# Fixture files: [(stream_name, file_data, content bytes)]
+def get_fixtures():
+    fixtures = []
+    for stream_name in sorted(os.listdir(FIXTURES_PATH)):
+        stream_path = os.path.join(FIXTURES_PATH, stream_name)
+        for file_name in sorted(os.listdir(stream_path)):
+            with open(os.path.join(stream_path, file_name), 'rb') as file:
+                content = file.read()
+            file_data = {
+                'name': file_name,
+                'path': 'fixtures/{}'.format(file_name),
+                'sha': '0' * 40,
+                'last_modified': '2020-03-27T00:00:00Z'
+            }
+            fixtures.append((stream_name, file_data, content))
+    return fixtures
+
+
+def singer_transform(catalog, stream_name, record):
+    stream = catalog.get_stream(stream_name)
+    with Transformer() as transformer:
+        return transformer.transform(
+            record, stream.schema.to_dict(), metadata.to_map(stream.metadata))
+
+
+# The conformer must write the same records as singer.Transformer (the per-record transform it
+#   replaces)
+class TestConformerMatchesSingerTransformer(unittest.TestCase):
+    def assert_same_records(self, catalog, stream_name, records):
+        conformer = get_conformer(catalog, stream_name)
+        for record in records:
+            expected = singer_transform(catalog, stream_name, dict(record))
+            self.assertEqual(conformer.conform(dict(record)), expected,
+                             msg='{}: {}'.format(stream_name, record))
+
+    def test_fixture_records(self):
+        for catalog in [get_selected_catalog(), discover()]:
+            for stream_name, file_data, content in get_fixtures():
+                records = list(iter_csv_records(stream_name, file_data, content))
+                self.assertTrue(records)
+                self.assert_same_records(catalog, stream_name, records)
+
+    def test_files_records(self):
+        catalog = get_selected_catalog()
+        record = {
+            'name': '03-23-2020.csv',
+            'path': 'csse_covid_19_data/csse_covid_19_daily_reports/03-23-2020.csv',
+            'sha': 'a' * 40,
+            'size': 123456,
+            'url': 'https://api.github.com/repos/CSSEGISandData/COVID-19/contents/x.csv',
+            'download_url': None,
+            'type': 'file',
+            'encoding': 'base64',
+            'last_modified': '2020-03-24T23:48:20Z',
+            'not_in_schema': 'x'
+        }
+        for stream_name in ['jh_csse_daily_files', 'italy_daily_files']:
+            self.assert_same_records(catalog, stream_name, [record])
+
+    def test_field_types(self):
+        schema = {
+            'type': 'object',
+            'properties': {
+                'integer': {'type': ['null', 'integer']},
+                'number': {'type': ['null', 'number']},
+                'boolean': {'type': ['null', 'boolean']},
+                'string': {'type': ['null', 'string']},
+                'datetime': {'type': ['null', 'string'], 'format': 'date-time'},
+                'number_or_string': {'type': ['null', 'number', 'string']},
+                'any_of': {'anyOf': [{'type': 'null'}, {'type': 'integer'}]},
+                'object': {'type': ['null', 'object'],
+                           'properties': {'value': {'type': ['null', 'integer']}}},
+                'array': {'type': ['null', 'array'], 'items': {'type': ['null', 'number']}},
+                'untyped': {},
+                'not_selected': {'type': ['null', 'string']},
+                'unsupported': {'type': ['null', 'string']},
+                'automatic': {'type': ['null', 'string']}
+            }
+        }
+        mdata = {
+            ('properties', 'not_selected'): {'selected': False},
+            ('properties', 'unsupported'): {'inclusion': 'unsupported'},
+            ('properties', 'automatic'): {'inclusion': 'automatic', 'selected': False}
+        }
+        records = [
+            {'integer': '1,234', 'number': '1,234.5', 'boolean': 'false', 'string': 12,
+             'datetime': '2020-03-23 23:19:34', 'number_or_string': 'abc', 'any_of': '7',
+             'object': {'value': '3'}, 'array': ['1.5', None], 'untyped': [1, 'a'],
+             'not_selected': 'x', 'unsupported': 'x', 'automatic': 'x', 'not_in_schema': 'x'},
+            {'integer': None, 'number': '', 'boolean': 'True', 'string': None, 'datetime': '',
+             'number_or_string': '2', 'any_of': None, 'object': None, 'array': None},
+            {'integer': 3.0, 'number': 5, 'boolean': 0, 'string': 'a',
+             'datetime': '3/22/20 23:45', 'number_or_string': 2.5}
+        ]
+        conformer = RecordConformer(schema, mdata)
+        for record in records:
+            with Transformer() as transformer:
+                expected = transformer.transform(dict(record), schema, mdata)
+            self.assertEqual(conformer.conform(dict(record)), expected, msg=record)
+
+    def test_mismatch(self):
+        schema = {'type': 'object', 'properties': {'integer': {'type': ['null', 'integer']}}}
+        record = {'integer': 'abc'}
+        with self.assertRaises(SchemaMismatch):
+            with Transformer() as transformer:
+                transformer.transform(dict(record), schema, {})
+        with self.assertRaises(SchemaMismatch):
+            RecordConformer(schema).conform(dict(record))
+        # Not strict: set to null
+        self.assertEqual(RecordConformer(schema, strict=False).conform(dict(record)),
+                         {'integer': None})
+
+
+if __name__ == '__main__':
+    unittest.main()
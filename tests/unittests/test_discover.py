@@ -0,0 +1,16 @@
+import json
+import unittest
+from tap_covid_19.discover import compile_catalog, get_catalog_json
+
+
+# The precompiled catalog (catalog.json) must be rebuilt after changing schemas/*.json or
+#   streams.py: python -m tap_covid_19.discover
+class TestPrecompiledCatalog(unittest.TestCase):
+    def test_catalog_is_current(self):
+        compiled = json.loads(json.dumps(compile_catalog().to_dict()))
+        self.assertEqual(json.loads(get_catalog_json()), compiled,
+                         msg='catalog.json is out of date: python -m tap_covid_19.discover')
+
+
+if __name__ == '__main__':
+    unittest.main()
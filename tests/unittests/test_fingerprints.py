@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+import unittest
+from tap_covid_19.fingerprints import PENDING_SUFFIX, RowFingerprints, get_row_fingerprint, \
+    get_row_key
+
+RECORD = {
+    'git_path': 'csse_covid_19_data/csse_covid_19_daily_reports/03-23-2020.csv',
+    'git_sha': 'a' * 40,
+    'git_last_modified': '2020-03-24T23:48:20Z',
+    'row_number': 1,
+    'province_state': 'Hubei',
+    'country_region': 'China',
+    'confirmed': 67800
+}
+KEY_PROPERTIES = ['git_path', 'row_number']
+PATH = RECORD['git_path']
+
+
+class TestRowFingerprint(unittest.TestCase):
+    def test_row_key(self):
+        self.assertEqual(get_row_key(RECORD, KEY_PROPERTIES), '["{}", 1]'.format(PATH))
+        self.assertEqual(get_row_key({'row_number': 1}, KEY_PROPERTIES), '[null, 1]')
+
+    def test_fingerprint(self):
+        fingerprint = get_row_fingerprint(RECORD)
+        self.assertEqual(len(fingerprint), 16)
+        # Same w/ the fields that change w/ every revision of the file, or in another order
+        record = dict(reversed(list(RECORD.items())))
+        record.update({'git_sha': 'b' * 40, 'git_last_modified': '2020-03-25T23:48:20Z'})
+        self.assertEqual(get_row_fingerprint(record), fingerprint)
+        # Changed values
+        record['confirmed'] = 67801
+        self.assertNotEqual(get_row_fingerprint(record), fingerprint)
+        record['confirmed'] = None
+        self.assertNotEqual(get_row_fingerprint(record), fingerprint)
+
+
+class TestRowFingerprints(unittest.TestCase):
+    def setUp(self):
+        self.store_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.store_path)
+
+    def test_commit(self):
+        store = RowFingerprints(self.store_path)
+        fingerprints = {get_row_key(RECORD, KEY_PROPERTIES): get_row_fingerprint(RECORD)}
+        store.put('jh_csse_daily', PATH, fingerprints)
+        # Pending until committed
+        self.assertEqual(store.get('jh_csse_daily', PATH), {})
+        store.commit('other_stream')
+        self.assertEqual(store.get('jh_csse_daily', PATH), {})
+        store.commit('jh_csse_daily')
+        self.assertEqual(store.get('jh_csse_daily', PATH), fingerprints)
+        self.assertEqual(store.get('italy_daily', PATH), {})
+        # Persisted
+        self.assertEqual(RowFingerprints(self.store_path).get('jh_csse_daily', PATH),
+                         fingerprints)
+
+    def test_uncommitted(self):
+        store = RowFingerprints(self.store_path)
+        store.put('jh_csse_daily', PATH, {'["a", 1]': '0' * 16})
+        store.commit('jh_csse_daily')
+        store.put('jh_csse_daily', PATH, {'["a", 1]': '1' * 16})
+        # Interrupted sync: the last committed fingerprints
+        store = RowFingerprints(self.store_path)
+        self.assertEqual(store.get('jh_csse_daily', PATH), {'["a", 1]': '0' * 16})
+        store.commit('jh_csse_daily')
+        self.assertEqual(store.get('jh_csse_daily', PATH), {'["a", 1]': '0' * 16})
+
+    def test_empty(self):
+        store = RowFingerprints(self.store_path)
+        store.put('jh_csse_daily', PATH, {})
+        store.commit('jh_csse_daily')
+        self.assertEqual(store.get('jh_csse_daily', PATH), {})
+
+    def test_store_id(self):
+        store_id = RowFingerprints(self.store_path).store_id
+        self.assertTrue(store_id)
+        self.assertEqual(RowFingerprints(self.store_path).store_id, store_id)
+        # Cleared store: new id (fingerprints committed w/ the state are not compared w/)
+        shutil.rmtree(self.store_path)
+        self.assertNotEqual(RowFingerprints(self.store_path).store_id, store_id)
+
+    def test_invalid_entry(self):
+        store = RowFingerprints(self.store_path)
+        store.put('jh_csse_daily', PATH, {'["a", 1]': '0' * 16})
+        store.commit('jh_csse_daily')
+        entry_dir = os.path.join(self.store_path, 'jh_csse_daily')
+        for file_name in os.listdir(entry_dir):
+            self.assertFalse(file_name.endswith(PENDING_SUFFIX))
+            with open(os.path.join(entry_dir, file_name), 'wb') as file:
+                file.write(b'not zlib')
+        with self.assertLogs(level='WARNING'):
+            self.assertEqual(store.get('jh_csse_daily', PATH), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
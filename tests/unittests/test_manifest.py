@@ -0,0 +1,55 @@
+import hashlib
+import unittest
+from tap_covid_19.manifest import MANIFEST_VERSION, SHA_LENGTH, decode_manifest, \
+    encode_manifest, short_sha
+
+
+def get_sha(value):
+    return hashlib.sha1(value.encode('utf-8')).hexdigest()
+
+
+class TestManifest(unittest.TestCase):
+    def test_round_trip(self):
+        manifest = {}
+        for day in range(1, 29):
+            path = 'csse_covid_19_data/csse_covid_19_daily_reports/02-{:02d}-2020.csv'.format(day)
+            manifest[path] = get_sha(path)
+        # Shared prefixes of different lengths, spaces and non-ascii characters
+        for path in ['a.csv', 'ab.csv', 'a/b.csv', 'dati-regioni/dpc-covid19-ita-regioni.csv',
+                     'dati-regioni/dpc-covid19-ita-regioni-latest.csv', 'données/été 2020.csv']:
+            manifest[path] = get_sha(path)
+
+        value = encode_manifest(manifest)
+        self.assertTrue(value.startswith(MANIFEST_VERSION))
+        expected = dict((path, sha[:SHA_LENGTH]) for path, sha in manifest.items())
+        self.assertEqual(decode_manifest(value), expected)
+        # Decoded (short) shas are encoded the same
+        self.assertEqual(encode_manifest(decode_manifest(value)), value)
+
+    def test_compact(self):
+        manifest = {}
+        for index in range(3000):
+            path = 'csse_covid_19_data/csse_covid_19_daily_reports/{:05d}.csv'.format(index)
+            manifest[path] = get_sha(path)
+        # Less than the short shas alone, in hex
+        self.assertLess(len(encode_manifest(manifest)), 3000 * SHA_LENGTH * 1.25)
+
+    def test_empty(self):
+        self.assertEqual(decode_manifest(encode_manifest({})), {})
+        self.assertEqual(decode_manifest(None), {})
+        self.assertEqual(decode_manifest(''), {})
+
+    def test_invalid(self):
+        self.assertEqual(decode_manifest('z0:abc'), {})
+        self.assertEqual(decode_manifest(MANIFEST_VERSION + 'not base64!'), {})
+        self.assertEqual(decode_manifest(MANIFEST_VERSION + 'YWJj'), {})
+
+    def test_short_sha(self):
+        sha = get_sha('file')
+        self.assertEqual(short_sha(sha), sha[:SHA_LENGTH])
+        self.assertIsNone(short_sha(None))
+        self.assertIsNone(short_sha(''))
+
+
+if __name__ == '__main__':
+    unittest.main()
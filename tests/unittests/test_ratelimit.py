@@ -0,0 +1,114 @@
+import unittest
+from unittest import mock
+from tap_covid_19.ratelimit import RESET_MARGIN_SECONDS, RateLimiter, get_resource
+
+NOW = 1585000000.0
+
+
+class Response(object):
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def rate_limit_headers(remaining, reset, resource='core'):
+    return {
+        'X-RateLimit-Limit': '5000',
+        'X-RateLimit-Remaining': str(remaining),
+        'X-RateLimit-Reset': str(int(reset)),
+        'X-RateLimit-Resource': resource
+    }
+
+
+# time.time() fixed at NOW; time.sleep() recorded (not slept)
+@mock.patch('tap_covid_19.ratelimit.time.time', return_value=NOW)
+@mock.patch('tap_covid_19.ratelimit.time.sleep')
+class TestRateLimiter(unittest.TestCase):
+    def test_get_resource(self, sleep, now):
+        self.assertEqual(get_resource('https://api.github.com/search/code?q=x'), 'code_search')
+        self.assertEqual(get_resource('https://api.github.com/search/commits?q=x'), 'search')
+        self.assertEqual(get_resource('https://api.github.com/graphql'), 'graphql')
+        self.assertEqual(get_resource('https://api.github.com/repos/a/b/contents/c'), 'core')
+        self.assertEqual(get_resource(None), 'core')
+
+    def test_no_wait_w_budget(self, sleep, now):
+        limiter = RateLimiter()
+        limiter.wait('core')
+        self.assertFalse(limiter.update('core', Response(200, rate_limit_headers(2, NOW + 60))))
+        self.assertEqual(limiter.get_budget('core'), [2, int(NOW + 60)])
+        limiter.wait('core')
+        limiter.wait('core')
+        # Each request is taken from the budget
+        self.assertEqual(limiter.get_budget('core'), [0, int(NOW + 60)])
+        sleep.assert_not_called()
+
+    def test_wait_for_reset(self, sleep, now):
+        limiter = RateLimiter()
+        limiter.update('core', Response(200, rate_limit_headers(0, NOW + 30)))
+        limiter.wait('core')
+        sleep.assert_called_once_with(30 + RESET_MARGIN_SECONDS)
+
+    def test_budget_reset(self, sleep, now):
+        limiter = RateLimiter()
+        limiter.update('core', Response(200, rate_limit_headers(0, NOW - 10)))
+        limiter.wait('core')
+        sleep.assert_not_called()
+        # Unknown until the next response
+        self.assertIsNone(limiter.get_budget('core'))
+
+    def test_resources(self, sleep, now):
+        limiter = RateLimiter()
+        limiter.update('search', Response(200, rate_limit_headers(0, NOW + 30, 'search')))
+        limiter.update('core', Response(200, rate_limit_headers(100, NOW + 3600)))
+        limiter.wait('core')
+        sleep.assert_not_called()
+        limiter.wait('search')
+        sleep.assert_called_once_with(30 + RESET_MARGIN_SECONDS)
+
+    def test_resource_header(self, sleep, now):
+        limiter = RateLimiter()
+        # X-RateLimit-Resource: the budget of the response's resource is updated
+        limiter.update('core', Response(200, rate_limit_headers(5, NOW + 30, 'search')))
+        self.assertIsNone(limiter.get_budget('core'))
+        self.assertEqual(limiter.get_budget('search'), [5, int(NOW + 30)])
+
+    def test_code_search(self, sleep, now):
+        limiter = RateLimiter()
+        resource = get_resource('https://api.github.com/search/code?q=x&page=2')
+        # Budget of the X-RateLimit-Resource header, waited for by the next code search request
+        limiter.update(resource, Response(200, rate_limit_headers(0, NOW + 30, 'code_search')))
+        limiter.wait('core')
+        limiter.wait('search')
+        sleep.assert_not_called()
+        limiter.wait(resource)
+        sleep.assert_called_once_with(30 + RESET_MARGIN_SECONDS)
+
+    def test_retry_after(self, sleep, now):
+        limiter = RateLimiter()
+        self.assertTrue(limiter.update('core', Response(429, {'Retry-After': '5'})))
+        limiter.wait('core')
+        sleep.assert_called_once_with(5)
+        sleep.reset_mock()
+        # All resources wait after Retry-After
+        limiter.wait('search')
+        sleep.assert_called_once_with(5)
+
+    def test_rate_limited(self, sleep, now):
+        limiter = RateLimiter()
+        self.assertTrue(limiter.update('core', Response(403, rate_limit_headers(0, NOW + 30))))
+        self.assertTrue(limiter.update('core', Response(403, {'Retry-After': '1'})))
+        # Other 403s (e.g. no access) are not rate limits to wait for
+        self.assertFalse(limiter.update('core', Response(403, rate_limit_headers(10, NOW + 30))))
+        self.assertFalse(limiter.update('core', Response(403)))
+
+    def test_invalid_headers(self, sleep, now):
+        limiter = RateLimiter()
+        self.assertFalse(limiter.update('core', Response(200, {
+            'X-RateLimit-Remaining': 'x', 'X-RateLimit-Reset': 'y', 'Retry-After': 'z'})))
+        self.assertIsNone(limiter.get_budget('core'))
+        limiter.wait('core')
+        sleep.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()